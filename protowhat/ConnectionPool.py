@@ -0,0 +1,244 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+"""
+This file holds the connection pool classes.
+"""
+
+
+class ConnectionPool:
+    """Reuse connections, e.g. the ``solution_conn`` of a ``State``, across submissions.
+
+    Connections are created on demand, up to ``max_size`` connections.
+    When all of them are in use, checking out a connection waits until one is returned,
+    for at most ``timeout`` seconds (30 by default).
+
+    Connections that are checked out have to be returned with ``checkin`` (or ``discard``),
+    preferably by using ``connection()`` or ``State.release_connections``.
+    A connection that is never returned keeps its slot in the pool,
+    so with ``timeout=None`` a checkout can wait forever.
+
+    :Example:
+
+        Reuse connections to a fixture database::
+
+            pool = ConnectionPool(
+                lambda: create_engine(db_url).connect(),
+                max_size=4,
+                check_health=lambda conn: not conn.closed,
+                close=lambda conn: conn.close(),
+            )
+
+            with pool.connection() as conn:
+                state = State(..., solution_conn=conn, ...)
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        max_size: int = 4,
+        check_health: Optional[Callable[[Any], bool]] = None,
+        close: Optional[Callable[[Any], None]] = None,
+        timeout: Optional[float] = 30,
+    ):
+        """
+        Args:
+            connect: function that creates a new connection
+            max_size: maximum number of connections, idle or in use
+            check_health: function to check if an idle connection can be reused.
+                Unhealthy connections are closed and replaced when checking out.
+            close: function to close a connection
+            timeout: default number of seconds to wait for a connection when all are in use,
+                wait indefinitely if None
+        """
+        if max_size < 1:
+            raise ValueError("The maximum size of a pool should be at least 1")
+
+        self.connect = connect
+        self.max_size = max_size
+        self.check_health = check_health
+        self._close = close
+        self.timeout = timeout
+
+        self._idle: List[Any] = []
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """Number of connections, idle or in use"""
+        return len(self._idle) + self._in_use
+
+    def checkout(self, timeout: Optional[float] = None) -> Any:
+        """Get a connection, reusing an idle connection if possible
+
+        Args:
+            timeout: number of seconds to wait when all connections are in use,
+                overrides the timeout of the pool
+
+        Raises:
+            TimeoutError: if no connection became available in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("The connection pool is closed")
+
+                # reserve a slot, check health and connect without holding the lock
+                if self._idle:
+                    conn = self._idle.pop()
+                    self._in_use += 1
+                    break
+
+                if self._in_use < self.max_size:
+                    conn = None
+                    self._in_use += 1
+                    break
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        "No connection available within %s seconds" % timeout
+                    )
+                self._condition.wait(remaining)
+
+        if conn is not None:
+            if self.check_health is None or self._is_healthy(conn):
+                return conn
+            # replace the unhealthy connection, in the same slot
+            self.close_connection(conn)
+
+        try:
+            return self.connect()
+        except:
+            self._release_slot()
+            raise
+
+    def checkin(self, conn):
+        """Return a connection to the pool"""
+        with self._condition:
+            self._in_use -= 1
+            closed = self._closed
+            if not closed:
+                self._idle.append(conn)
+            self._condition.notify()
+
+        if closed:
+            self.close_connection(conn)
+
+    def discard(self, conn):
+        """Close a connection that was checked out, instead of returning it"""
+        self.close_connection(conn)
+        self._release_slot()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Check out a connection for the duration of a with block"""
+        conn = self.checkout(timeout)
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close(self):
+        """Close the idle connections, connections in use are closed when returned"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for conn in idle:
+            self.close_connection(conn)
+
+    def close_connection(self, conn):
+        if self._close is not None:
+            try:
+                self._close(conn)
+            except Exception:
+                pass
+
+    def _is_healthy(self, conn) -> bool:
+        try:
+            return bool(self.check_health(conn))
+        except Exception:
+            return False
+
+    def _release_slot(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class KeyedConnectionPool:
+    """Separate connection pools per key, e.g. per exercise or fixture database
+
+    :Example:
+
+        Reuse connections to the database of every exercise::
+
+            pools = KeyedConnectionPool(
+                lambda exercise_id: connect(get_db_url(exercise_id)), max_size=2
+            )
+            solution_conn = root_state.checkout_connection(pools.get(exercise_id))
+    """
+
+    def __init__(self, connect: Callable[[Hashable], Any], **pool_kwargs):
+        """
+        Args:
+            connect: function that creates a new connection for a key
+            pool_kwargs: arguments for the ``ConnectionPool`` of every key
+        """
+        self.connect = connect
+        self.pool_kwargs = pool_kwargs
+        self.pools: Dict[Hashable, ConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> ConnectionPool:
+        """Get the pool for a key, creating it on first use"""
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = self.pools[key] = ConnectionPool(
+                    lambda: self.connect(key), **self.pool_kwargs
+                )
+            return pool
+
+    def checkout(self, key: Hashable, timeout: Optional[float] = None) -> Any:
+        return self.get(key).checkout(timeout)
+
+    def checkin(self, key: Hashable, conn):
+        with self._lock:
+            pool = self.pools.get(key)
+        if pool is not None:
+            pool.checkin(conn)
+        else:
+            # the pools were closed while the connection was in use
+            close = self.pool_kwargs.get("close")
+            if close is not None:
+                try:
+                    close(conn)
+                except Exception:
+                    pass
+
+    def close(self):
+        with self._lock:
+            pools, self.pools = self.pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,6 +1,5 @@
 from typing import Dict, Union, List
 from collections import Counter
-from jinja2 import Template
 
 
 class FeedbackComponent:
@@ -68,6 +67,10 @@ class Feedback:
         return highlight or {}
 
     def get_message(self):
+        # imported on first use: jinja2 is slow to import
+        # and not needed when feedback is never rendered
+        from jinja2 import Template
+
         out_list = []
         msgs = [*filter(lambda x: x is not None, self.context_components), self.conclusion]
 
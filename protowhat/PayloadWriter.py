@@ -0,0 +1,97 @@
+import bz2
+import gzip
+import json
+import lzma
+from pathlib import Path
+from typing import IO, Union
+
+"""
+This file holds the payload writer class.
+"""
+
+COMPRESSIONS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+class PayloadWriter:
+    """Write payloads built by a ``Reporter`` as newline-delimited JSON.
+
+    Payloads are written incrementally and buffered,
+    so memory use is constant when grading many submissions.
+
+    :Example:
+
+        Write the results of grading a lot of submissions to a compressed file::
+
+            with PayloadWriter("results.jsonl.gz") as writer:
+                for submission_id, submission in submissions:
+                    payload = grade(submission)
+                    writer.write(payload, submission_id=submission_id)
+    """
+
+    def __init__(
+        self,
+        file: Union[str, Path, IO[str]],
+        compression: str = None,
+        buffer_size: int = 1 << 16,
+    ):
+        """
+        Args:
+            file: path of the file to create or a writable text file object
+            compression: one of 'gzip', 'bz2' or 'xz'.
+                If not specified, the compression is derived from the suffix of the path.
+            buffer_size: number of characters to collect before writing to the file
+        """
+        if isinstance(file, (str, Path)):
+            if compression is None:
+                compression = COMPRESSION_SUFFIXES.get(Path(file).suffix)
+            if compression is not None and compression not in COMPRESSIONS:
+                raise ValueError(
+                    "Unknown compression %s, use one of: %s"
+                    % (compression, ", ".join(COMPRESSIONS))
+                )
+            open_file = COMPRESSIONS.get(compression, open)
+            self.file = open_file(file, "wt", encoding="utf-8")
+            self.owns_file = True
+        elif compression is not None:
+            raise ValueError("Compression is only supported when passing a path")
+        else:
+            self.file = file
+            self.owns_file = False
+
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, payload: dict, **metadata):
+        """Write a payload
+
+        Args:
+            payload: payload to write
+            metadata: extra keys to add to the payload, e.g. an id of the submission
+        """
+        line = json.dumps({**metadata, **payload}, default=str) + "\n"
+        self._buffer.append(line)
+        self._buffered += len(line)
+        self.count += 1
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.file.write("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,7 +1,5 @@
 import re
 
-import markdown2
-
 from protowhat.Feedback import Feedback
 from protowhat.Test import Test
 
@@ -59,10 +57,17 @@ class Reporter(TestRunnerProxy):
 
     This class holds the feedback- or success message and tracks whether there are failed tests
     or not. All tests are executed trough do_test() in the Reporter.
+
+    In correctness only mode, no feedback is built for failing tests
+    and the payloads only contain whether the submission is correct.
+    A reporter inherits this mode from the reporter it's proxying if it isn't set explicitly.
     """
 
-    def __init__(self, runner=None, errors=None):
+    def __init__(self, runner=None, errors=None, correctness_only=None):
         super().__init__(runner or TestRunner())
+        if correctness_only is None:
+            correctness_only = getattr(self.runner, "correctness_only", False)
+        self.correctness_only = correctness_only
         self.fail = False
         self.errors = errors
         self.errors_allowed = False
@@ -75,6 +80,9 @@ class Reporter(TestRunnerProxy):
         self.errors_allowed = True
 
     def build_failed_payload(self, feedback: Feedback):
+        if self.correctness_only:
+            return {"correct": False}
+
         return {
             "correct": False,
             "message": Reporter.to_html(feedback.get_message()),
@@ -91,10 +99,17 @@ class Reporter(TestRunnerProxy):
             correct = True
             feedback_msg = self.success_msg
 
+        if self.correctness_only:
+            return {"correct": correct}
+
         return {"correct": correct, "message": Reporter.to_html(feedback_msg)}
 
     @staticmethod
     def to_html(msg):
+        # imported on first use: markdown2 (and Pygments) are slow to import
+        # and not needed when feedback is never rendered
+        import markdown2
+
         return re.sub(
             "<p>(.*)</p>",
             "\\1",
@@ -1,11 +1,12 @@
 from copy import copy
-from typing import Union
+from typing import Any, Callable, Mapping, Optional, Union
 
+from protowhat.ConnectionPool import ConnectionPool
 from protowhat.selectors import DispatcherInterface
 from protowhat.Feedback import Feedback, FeedbackComponent
 from protowhat.Test import Fail, Test
 from protowhat.failure import TestFail, debugger, InstructorError
-from protowhat.utils import parameters_attr
+from protowhat.utils import LRUCache, make_hashable, parameters_attr
 
 
 class DummyDispatcher(DispatcherInterface):
@@ -99,10 +100,124 @@ class State:
     def is_root(self):
         return self.parent_state is None
 
+    @property
+    def correctness_only(self) -> bool:
+        """Whether feedback messages can be skipped, as only the correctness matters"""
+        return getattr(self.reporter, "correctness_only", False)
+
     @property
     def state_history(self):
         return getattr(self.parent_state, "state_history", []) + [self]
 
+    def get_state_path(self) -> tuple:
+        """Identify this state by the checks that created it, starting from the root state
+
+        Raises:
+            TypeError: if a state wasn't created by a linked check,
+                e.g. when checks call each other directly,
+                or if the arguments of a check can't be identified by their value
+        """
+        path = []
+        for state in self.state_history:
+            if state.creator is None and state.is_root:
+                continue
+            if state.creator is None or state.creator["type"] == "to_child":
+                raise TypeError("Can't identify a state that wasn't created by a check")
+            args = {k: v for k, v in state.creator["args"].items() if k != "state"}
+            path.append((state.creator["type"], make_hashable(args)))
+        return tuple(path)
+
+    @property
+    def solution_cache(self) -> Optional[LRUCache]:
+        """Cache for results computed from the solution, shared by all submissions of an exercise
+
+        Set it on the root state, e.g. ``state.solution_cache = cache_for_exercise``.
+        """
+        return getattr(self.state_history[0], "_solution_cache", None)
+
+    @solution_cache.setter
+    def solution_cache(self, cache: Optional[LRUCache]):
+        self.state_history[0]._solution_cache = cache
+
+    @property
+    def check_cache(self) -> Optional[dict]:
+        """Cache for the results of pure checks in the current SCT run
+
+        Memoizing pure checks is enabled by setting it on the root state,
+        e.g. ``state.check_cache = {}``.
+        """
+        return getattr(self.state_history[0], "_check_cache", None)
+
+    @check_cache.setter
+    def check_cache(self, cache: Optional[dict]):
+        self.state_history[0]._check_cache = cache
+
+    @property
+    def check_log(self) -> Optional[list]:
+        """Names and failures of the checks run in the current SCT run
+
+        Recording them is enabled by setting it on the root state,
+        e.g. ``state.check_log = []``, see ``validate_sct``.
+        """
+        return getattr(self.state_history[0], "_check_log", None)
+
+    @check_log.setter
+    def check_log(self, log: Optional[list]):
+        self.state_history[0]._check_log = log
+
+    @property
+    def solution_lookups(self) -> Optional[list]:
+        """Keys of the solution results looked up in the current SCT run
+
+        Recording them is enabled by setting it on the root state,
+        e.g. ``state.solution_lookups = []``, see ``memoize_solution``.
+        """
+        return getattr(self.state_history[0], "_solution_lookups", None)
+
+    @solution_lookups.setter
+    def solution_lookups(self, lookups: Optional[list]):
+        self.state_history[0]._solution_lookups = lookups
+
+    @property
+    def chainable_functions(self) -> Optional[Mapping[str, Callable]]:
+        """Functions that can be chained in the SCT context of the current run
+
+        Set on the root state when creating an SCT context from a template,
+        see ``SctContextTemplate.create``.
+        """
+        return getattr(self.state_history[0], "_chainable_functions", None)
+
+    @chainable_functions.setter
+    def chainable_functions(self, functions: Optional[Mapping[str, Callable]]):
+        self.state_history[0]._chainable_functions = functions
+
+    def memoize_solution(self, check_name: str, compute: Callable[[], Any], **args):
+        """Get a result computed from the solution, reusing it for later submissions
+
+        The result is identified by the check name, the path of this state from the root state
+        and the arguments. It should only depend on the solution side of the state.
+        If these can't be identified by their value (see ``make_hashable``),
+        the result is computed without caching it.
+
+        Args:
+            check_name: name of the check that needs the result
+            compute: function that computes the result
+            args: arguments that the result depends on
+        """
+        cache = self.solution_cache
+        if cache is None:
+            return compute()
+
+        try:
+            key = (check_name, self.get_state_path(), make_hashable(args))
+        except TypeError:
+            return compute()
+
+        lookups = self.solution_lookups
+        if lookups is not None:
+            lookups.append(key)
+        return cache.get_or_set(key, compute)
+
     def get_ast_path(self):
         rev_checks = filter(
             lambda x: x.creator is not None
@@ -142,12 +257,37 @@ class State:
         result, test_feedback = self.reporter.do_test(test)
         if result is False:
             failure_type = InstructorError if self.debug else TestFail
-            raise failure_type(self.get_feedback(test_feedback), self.state_history)
+            if self.correctness_only:
+                feedback = self.feedback_cls(test_feedback)
+            else:
+                feedback = self.get_feedback(test_feedback)
+            raise failure_type(feedback, self.state_history)
         return result, test_feedback
 
     def do_tests(self, tests):
         return [self.do_test(test) for test in tests]
 
+    def checkout_connection(self, pool: ConnectionPool):
+        """Get a connection from a pool, for use in this submission
+
+        The connection is returned to the pool by ``release_connections``.
+        """
+        conn = pool.checkout()
+        root_state = self.state_history[0]
+        pooled_connections = getattr(root_state, "_pooled_connections", None)
+        if pooled_connections is None:
+            pooled_connections = root_state._pooled_connections = []
+        pooled_connections.append((pool, conn))
+        return conn
+
+    def release_connections(self):
+        """Return the connections checked out for this submission to their pools"""
+        root_state = self.state_history[0]
+        pooled_connections = getattr(root_state, "_pooled_connections", None) or []
+        root_state._pooled_connections = []
+        for pool, conn in pooled_connections:
+            pool.checkin(conn)
+
     def get_feedback(self, conclusion):
         full_code_position = self.feedback_cls.get_highlight_position(
             self.state_history[0].student_ast
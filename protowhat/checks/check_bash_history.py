@@ -1,9 +1,11 @@
 import os
 import re
+import signal
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from subprocess import run
-from typing import List, Optional
+from subprocess import CompletedProcess, PIPE, Popen, TimeoutExpired
+from typing import List, Optional, Sequence, Union
 
 from protowhat.failure import InstructorError, debugger
 from protowhat.State import State
@@ -190,7 +192,12 @@ def has_command(state, pattern, msg, fixed=False, commands=None):
 
 
 def prepare_validation(
-    state: State, commands: List[str], bash_history_path: Optional[str] = None
+    state: State,
+    commands: List[Union[str, List[str]]],
+    bash_history_path: Optional[str] = None,
+    concurrent: bool = False,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
 ) -> State:
     """Let the exercise validation know what shell commands are required to complete the exercise
 
@@ -198,8 +205,17 @@ def prepare_validation(
 
     Args:
         state: State instance describing student and solution code. Can be omitted if used with Ex().
-        commands: List of strings that a student is expected to execute
+        commands: List of strings that a student is expected to execute.
+            An entry can also be a list of strings: a dependency group of commands
+            that have to be executed in that order.
         bash_history_path (str | Path): path to the bash history file
+        concurrent: if ``True``, independent entries of ``commands`` are executed concurrently.
+            The output of every command is captured and available in ``state.validation_results``,
+            a list with the results of every entry of ``commands`` (see ``run_command_groups``).
+        max_workers: maximum number of commands that run at the same time in concurrent mode.
+        timeout: number of seconds after which a command is killed.
+
+    In a dependency group, the commands after a failed or timed out command are skipped.
 
     :Example:
 
@@ -211,19 +227,102 @@ def prepare_validation(
 
         Further down you can now use ``has_command``.
 
+    :Example:
+
+        The goal of an exercise is to download two files and to extract the first one.
+
+        The download of the second file doesn't depend on the first one,
+        so they can be executed at the same time::
+
+            Ex().prepare_validation(
+                [["wget data.com/a.zip", "unzip a.zip"], "wget data.com/b.csv"],
+                concurrent=True,
+                timeout=60,
+            )
+
     """
     if state.force_diagnose:
-        for command in commands:
-            run(command, shell=True)
+        groups = [
+            [group] if isinstance(group, str) else list(group) for group in commands
+        ]
+
+        if concurrent:
+            state.validation_results = run_command_groups(
+                groups, max_workers=max_workers, timeout=timeout
+            )
+        else:
+            for group in groups:
+                for command in group:
+                    result = run_command(command, timeout, capture_output=False)
+                    if result.returncode != 0:
+                        break
 
         if bash_history_path is None:
             bash_history_path = os.environ[BASH_HISTORY_PATH_ENV]
         with open(bash_history_path, mode="a", encoding="utf-8") as f:
-            f.write("\n".join(commands) + "\n")
+            f.write("\n".join(command for group in groups for command in group) + "\n")
 
     return state
 
 
+def run_command(
+    command: str, timeout: Optional[float] = None, capture_output=True
+) -> CompletedProcess:
+    """Run a shell command and capture its output
+
+    The command runs in a new session, so all processes it started
+    (e.g. both sides of ``wget ... && unzip ...``) are killed when it times out.
+    A timed out command results in a ``CompletedProcess`` with ``returncode`` ``None``.
+    """
+    pipe = PIPE if capture_output else None
+    with Popen(
+        command,
+        shell=True,
+        stdout=pipe,
+        stderr=pipe,
+        text=True,
+        start_new_session=True,
+    ) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            stdout, stderr = process.communicate()
+            return CompletedProcess(command, None, stdout, stderr)
+
+    return CompletedProcess(command, process.returncode, stdout, stderr)
+
+
+def run_command_groups(
+    groups: Sequence[Sequence[str]],
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[List[CompletedProcess]]:
+    """Run groups of shell commands concurrently, the commands in a group in order
+
+    The commands in a group after a failed or timed out command are skipped.
+
+    Returns:
+        for every group, the ``CompletedProcess`` of its executed commands, in order.
+        The command of a result is available as its ``args``.
+    """
+
+    def run_group(group):
+        results = []
+        for command in group:
+            result = run_command(command, timeout)
+            results.append(result)
+            if result.returncode != 0:
+                break
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_group, groups))
+
+
 """
 # Other SCTs using bash history as the code?
 
@@ -1,7 +1,16 @@
+import mmap
+import os
+
 from pathlib import Path
+from typing import Optional, Union
 
 from protowhat.failure import debugger
 from protowhat.State import State
+from protowhat.utils import LRUCache
+from protowhat.utils_files import WorkspaceSnapshot, get_file_info
+
+# parse results of solution code are the same for every submission
+SOLUTION_AST_CACHE = LRUCache(maxsize=256)
 
 
 def check_file(
@@ -11,6 +20,10 @@ def check_file(
     is_dir_msg="Want to check the file `{}`, but found a directory.",
     parse=True,
     solution_code=None,
+    workspace: WorkspaceSnapshot = None,
+    max_size: Optional[int] = None,
+    too_large_msg="The file `{}` is too large to check.",
+    memory_map=False,
 ):
     """Test whether file exists, and make its contents the student code.
 
@@ -23,6 +36,14 @@ def check_file(
             This enables more checks on the content of the file.
         solution_code: this argument can be used to pass the expected code for the file
             so it can be used by subsequent checks.
+        workspace: a ``WorkspaceSnapshot`` to look up the file in, instead of the file system.
+            This avoids repeated system calls when many files are checked.
+        max_size: maximum size of the file in bytes. Larger files are not read.
+        too_large_msg: feedback message if the file is larger than ``max_size``,
+            or than the ``max_size`` of the ``workspace``
+        memory_map: If ``True``, the file is memory-mapped instead of read into memory.
+            The student code is then a bytes-like object that can be searched using ``has_code``,
+            but the file is not parsed.
 
     Note:
         This SCT fails if the file is a directory.
@@ -33,28 +54,51 @@ def check_file(
         of the directory where the exercise is run, use this SCT::
 
             Ex().check_file("resources/my_output.txt", parse=False)
+
+        To check a potentially huge output file without loading it in memory, use::
+
+            Ex().check_file("output.log", max_size=10 ** 9, memory_map=True).has_code("DONE", fixed=True)
     """
 
     path_obj = Path(path)
-    if not path_obj.exists():
+    info = workspace.get_info(path_obj) if workspace else get_file_info(path_obj)
+    if info is None:
         state.report(missing_msg.format(path))  # test file exists
-    if path_obj.is_dir():
+    if info.is_dir:
         state.report(is_dir_msg.format(path))  # test its not a dir
-
-    code = get_file_content(path_obj)
+    if max_size is not None and info.size > max_size:
+        state.report(too_large_msg.format(path))
+
+    if memory_map:
+        code = get_file_mmap(path_obj)
+        student_ast = False
+    else:
+        # reuse content and parse results for files checked earlier in this submission
+        file_cache = get_submission_file_cache(state)
+        if workspace:
+            # the workspace doesn't read files that are larger than its maximum size
+            if workspace.max_size is not None and info.size > workspace.max_size:
+                state.report(too_large_msg.format(path))
+            code = workspace.read_text(path_obj)
+        else:
+            content_key = ("content", path_obj.absolute(), info)
+            if content_key not in file_cache:
+                file_cache[content_key] = get_file_content(path_obj)
+            code = file_cache[content_key]
+        student_ast = parse_cached(state, code, file_cache) if parse else False
 
     sol_kwargs = {"solution_code": solution_code, "solution_ast": None}
     if solution_code:
         solution_ast = False
         if parse:
             with debugger(state):
-                solution_ast = state.parse(solution_code)
+                solution_ast = parse_cached(state, solution_code, SOLUTION_AST_CACHE)
         sol_kwargs["solution_ast"] = solution_ast
 
     child_state = state.to_child(
         append_message="We checked the file `{}`. ".format(path),
         student_code=code,
-        student_ast=state.parse(code) if parse else False,
+        student_ast=student_ast,
         **sol_kwargs
     )
 
@@ -63,13 +107,19 @@ def check_file(
     return child_state
 
 
-def has_dir(state: State, path, msg="Did you create a directory `{}`?"):
+def has_dir(
+    state: State,
+    path,
+    msg="Did you create a directory `{}`?",
+    workspace: WorkspaceSnapshot = None,
+):
     """Test whether a directory exists.
 
     Args:
         state: State instance describing student and solution code. Can be omitted if used with Ex().
         path: expected location of the directory
         msg: feedback message if no directory is found in the expected location
+        workspace: a ``WorkspaceSnapshot`` to look up the directory in, instead of the file system.
 
     :Example:
 
@@ -78,22 +128,48 @@ def has_dir(state: State, path, msg="Did you create a directory `{}`?"):
 
             Ex().has_dir("resources")
     """
-    if not Path(path).is_dir():
+    is_dir = workspace.is_dir(path) if workspace else Path(path).is_dir()
+    if not is_dir:
         state.report(msg.format(path))
 
     return state
 
 
 # helper functions
-def load_file(relative_path, prefix=""):
+def get_submission_file_cache(state: State) -> dict:
+    """Get the cache for file contents and parse results, shared by all states of a submission"""
+    root_state = state.state_history[0]
+    file_cache = getattr(root_state, "_file_cache", None)
+    if file_cache is None:
+        file_cache = root_state._file_cache = {}
+    return file_cache
+
+
+def parse_cached(state: State, code, cache):
+    """Parse code using the parser of the state, reusing results from the cache
+
+    Failing parses (reported by the state) are not cached.
+    """
+    dispatcher = state.ast_dispatcher
+    parser = getattr(dispatcher, "ast_mod", None) or type(dispatcher)
+    key = ("ast", parser, code)
+    if key not in cache:
+        cache[key] = state.parse(code)
+    return cache[key]
+
+
+def load_file(relative_path, prefix="", workspace: WorkspaceSnapshot = None):
     # the prefix can be partialed
     # so it's not needed to copy the common part of paths
     path = Path(prefix, relative_path)
 
-    return get_file_content(path)
+    return get_file_content(path, workspace)
+
 
+def get_file_content(path, workspace: WorkspaceSnapshot = None):
+    if workspace is not None:
+        return workspace.read_text(path)
 
-def get_file_content(path):
     if not isinstance(path, Path):
         path = Path(path)
 
@@ -103,3 +179,15 @@ def get_file_content(path):
         content = None
 
     return content
+
+
+def get_file_mmap(path) -> Optional[Union[mmap.mmap, bytes]]:
+    """Get a read-only memory map of the file content, without loading it in memory"""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""  # empty files can't be mapped
+            # the map stays valid after closing the file
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except:
+        return None
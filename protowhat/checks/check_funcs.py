@@ -1,13 +1,25 @@
+import mmap
 import re
 
+from collections.abc import Iterator
+from copy import copy
 from functools import partial, wraps
+from itertools import islice
+from typing import Any, NamedTuple
 
 from protowhat.Feedback import Feedback
+from protowhat.sct_syntax import pure_check
+from protowhat.utils import LRUCache
+from protowhat.utils_ast import find_difference
+from protowhat.utils_normalize import Normalizer
 
 MSG_CHECK_FALLBACK = "Your submission is incorrect. Try again!"
 DEFAULT_MISSING_MSG = "Could not find the {index}{node_name}."
 DEFAULT_APPEND_MSG = "Check the {index}{node_name}. "
 
+# parse results of sql snippets are the same for every submission
+SQL_SNIPPET_CACHE = LRUCache(maxsize=1024)
+
 
 def requires_ast(f):
     @wraps(f)
@@ -37,6 +49,7 @@ def requires_ast(f):
     return wrapper
 
 
+@pure_check
 @requires_ast
 def check_node(
     state, name, index=0, missing_msg=None, priority=None
@@ -48,6 +61,7 @@ def check_node(
         name : the name of the abstract syntax tree node to find.
         index: the position of that node (see below for details).
         missing_msg: feedback message if node is not in student AST.
+            ``{count}`` is replaced with the number of matching nodes in the student AST.
         priority: the priority level of the node being searched for. This determines whether to
                   descend into other AST nodes during the search. Higher priority nodes descend
                   into lower priority. Currently, the only important part of priority is that
@@ -71,22 +85,29 @@ def check_node(
     has_custom_message = bool(missing_msg)
     if missing_msg is None:
         missing_msg = DEFAULT_MISSING_MSG
-    df = partial(state.ast_dispatcher.find, name, priority=priority)
+    # only traverses the trees until the node at index is found
+    find_nth = partial(
+        state.ast_dispatcher.find_nth, name, index=index, priority=priority
+    )
 
-    sol_stmt_list = df(state.solution_ast)
-    try:
-        sol_stmt = sol_stmt_list[index]
-    except IndexError:
+    sol_stmt, _ = state.memoize_solution(
+        "check_node",
+        lambda: find_nth(state.solution_ast),
+        name=name,
+        index=index,
+        priority=priority,
+    )
+    if sol_stmt is None:
         raise IndexError("Can't get %s statement at index %s" % (name, index))
 
-    stu_stmt_list = df(state.student_ast)
-    try:
-        stu_stmt = stu_stmt_list[index]
-    except IndexError:
+    stu_stmt, stu_count = find_nth(state.student_ast)
+    if stu_stmt is None:
+        if state.correctness_only:
+            state.report(MSG_CHECK_FALLBACK)
         # use speaker on ast dialect module to get message, or fall back to generic
         ast_path = state.get_ast_path() or "highlighted code"
         msg = state.ast_dispatcher.describe(
-            sol_stmt, missing_msg, index=index, ast_path=ast_path
+            sol_stmt, missing_msg, index=index, ast_path=ast_path, count=stu_count
         )
         if msg is None:
             msg = MSG_CHECK_FALLBACK
@@ -94,14 +115,17 @@ def check_node(
             state.report(msg, append=False)
         state.report(msg)
 
-    append_message = state.ast_dispatcher.describe(
-        sol_stmt, DEFAULT_APPEND_MSG, index=index
-    )
+    append_message = None
+    if not state.correctness_only:
+        append_message = state.ast_dispatcher.describe(
+            sol_stmt, DEFAULT_APPEND_MSG, index=index
+        )
     return state.to_child(
         student_ast=stu_stmt, solution_ast=sol_stmt, append_message=append_message
     )
 
 
+@pure_check
 @requires_ast
 def check_edge(state, name, index=0, missing_msg=None):
     """Select an attribute from an abstract syntax tree (AST) node, using the attribute name.
@@ -109,7 +133,9 @@ def check_edge(state, name, index=0, missing_msg=None):
     Args:
         state: State instance describing student and solution code. Can be omitted if used with Ex().
         name: the name of the attribute to select from current AST node.
-        index: entry to get from a list field. If too few entires, will fail with missing_msg.
+            This can also be a path, e.g. ``"body.*.value"`` (see ``DispatcherInterface.select``).
+        index: entry to get from a list field, or from the matches of a path with wildcards.
+            If too few entires, will fail with missing_msg.
         missing_msg: feedback message if attribute is not in student AST.
 
     :Example:
@@ -135,44 +161,62 @@ def check_edge(state, name, index=0, missing_msg=None):
 
     def select(node_name, node):
         attr = state.ast_dispatcher.select(node_name, node)
-        if attr and isinstance(attr, list) and index is not None:
+        if isinstance(attr, Iterator):
+            # path with wildcards or slices
+            if index is None:
+                attr = list(attr)
+            else:
+                attr = next(islice(attr, index, None), None)
+        elif attr and isinstance(attr, list) and index is not None:
             attr = attr[index]
         return attr
 
+    def report_missing():
+        if state.correctness_only:
+            state.report(MSG_CHECK_FALLBACK)
+
+        # use speaker on ast dialect module to get message, or fall back to generic
+        ast_path = state.get_ast_path() or "highlighted code"
+        _msg = state.ast_dispatcher.describe(
+            state.student_ast, missing_msg, field=name, index=index, ast_path=ast_path
+        )
+        if _msg is None:
+            _msg = MSG_CHECK_FALLBACK
+
+        if has_custom_message:
+            state.report(_msg, append=False)
+        state.report(_msg)
+
     try:
-        sol_attr = select(name, state.solution_ast)
+        sol_attr = state.memoize_solution(
+            "check_edge",
+            lambda: select(name, state.solution_ast),
+            name=name,
+            index=index,
+        )
     except IndexError:
         raise IndexError("Can't get %s attribute" % name)
 
-    # use speaker on ast dialect module to get message, or fall back to generic
-    ast_path = state.get_ast_path() or "highlighted code"
-    _msg = state.ast_dispatcher.describe(
-        state.student_ast, missing_msg, field=name, index=index, ast_path=ast_path
-    )
-    if _msg is None:
-        _msg = MSG_CHECK_FALLBACK
-
     try:
         stu_attr = select(name, state.student_ast)
     except:
-        if has_custom_message:
-            state.report(_msg, append=False)
-        state.report(_msg)
+        report_missing()
 
     # fail if attribute exists, but is none only for student
     if stu_attr is None and sol_attr is not None:
-        if has_custom_message:
-            state.report(_msg, append=False)
-        state.report(_msg)
+        report_missing()
 
-    append_message = state.ast_dispatcher.describe(
-        state.student_ast, "Check the {field_name}. ", index=index, field=name
-    )
+    append_message = None
+    if not state.correctness_only:
+        append_message = state.ast_dispatcher.describe(
+            state.student_ast, "Check the {field_name}. ", index=index, field=name
+        )
     return state.to_child(
         student_ast=stu_attr, solution_ast=sol_attr, append_message=append_message
     )
 
 
+@pure_check
 def has_code(
     state,
     text,
@@ -187,6 +231,10 @@ def has_code(
         incorrect_msg: feedback message if text is not in student code.
         fixed: whether to match text exactly, rather than using regular expressions.
 
+    Note:
+        If the student code is bytes-like (e.g. a memory-mapped file from ``check_file``),
+        ``text`` is UTF-8 encoded (if it isn't bytes already) and searched for without decoding the code.
+
     Note:
         Functions like ``check_node`` focus on certain parts of code.
         Using these functions followed by ``has_code`` will only look
@@ -234,19 +282,25 @@ def has_code(
 
     stu_text = get_text(stu_ast, stu_code)
 
-    _msg = incorrect_msg.format(
-        ast_path=state.get_ast_path() or "highlighted code", text=text
-    )
-
     # either simple text matching or regex test
-    res = text in stu_text if fixed else re.search(text, stu_text)
+    if isinstance(stu_text, (bytes, mmap.mmap)):
+        pattern = text.encode("utf-8") if isinstance(text, str) else text
+        res = stu_text.find(pattern) != -1 if fixed else re.search(pattern, stu_text)
+    else:
+        res = text in stu_text if fixed else re.search(text, stu_text)
 
     if not res:
+        if state.correctness_only:
+            state.report(MSG_CHECK_FALLBACK)
+        _msg = incorrect_msg.format(
+            ast_path=state.get_ast_path() or "highlighted code", text=text
+        )
         state.report(_msg)
 
     return state
 
 
+@pure_check
 @requires_ast
 def has_equal_ast(
     state,
@@ -255,6 +309,7 @@ def has_equal_ast(
     start=["expression", "subquery", "sql_script"][0],
     exact=None,
     should_append_msg=False,
+    normalizer: Normalizer = None,
 ):
     """Test whether the student and solution code have identical AST representations
 
@@ -269,6 +324,9 @@ def has_equal_ast(
                defaults to ``True`` if ``sql`` is not specified, and to ``False``
                if ``sql`` is specified. You can always specify it manually.
         should_append_msg: prepend the auto generated incorrect_msg with the previous append_messages.
+        normalizer: a ``Normalizer`` from ``protowhat.utils_normalize`` to compare the ASTs with
+               after normalizing them, e.g. ignoring the order of operands of commutative operators.
+               This avoids having to list all equivalent alternatives of the solution.
 
     :Example:
 
@@ -290,6 +348,14 @@ def has_equal_ast(
                 .check_edge('where_clause') \\/
                 .has_equal_ast(sql = 'id > 1')
 
+        Example 3 - To accept both ``name = 'filip'`` and ``'filip' = name``,
+        compare the ASTs after sorting the operands of ``=``::
+
+            normalizer = Normalizer([sort_commutative(['BinaryExpr'], operators=['='])])
+            Ex().check_node('SelectStmt') \\/
+                .check_edge('where_clause') \\/
+                .has_equal_ast(sql = "name = 'filip'", normalizer = normalizer)
+
     """
     has_custom_message = bool(incorrect_msg)
     if not has_custom_message:
@@ -298,16 +364,28 @@ def has_equal_ast(
         else:
             incorrect_msg = "Check the {ast_path}. {extra}"
 
-    ast = state.ast_dispatcher.ast_mod
-    sol_ast = state.solution_ast if sql is None else ast.parse(sql, start)
+    if sql is None:
+        sol_ast, sol_rep = state.solution_ast, None
+    else:
+        sol_ast, sol_rep = parse_snippet(state.ast_dispatcher.ast_mod, sql, start)
 
     # if sql is set, exact defaults to False.
     # if sql not set, exact defaults to True.
     if exact is None:
         exact = sql is None
 
-    stu_rep = repr(state.student_ast)
-    sol_rep = repr(sol_ast)
+    if normalizer is None:
+        stu_rep = repr(state.student_ast)
+        if sol_rep is None:
+            sol_rep = repr(sol_ast)
+        is_equal = sol_rep == stu_rep if exact else sol_rep in stu_rep
+    else:
+        stu_normalized = normalizer.normalize(state.student_ast)
+        sol_normalized = normalizer.normalize(sol_ast)
+        if exact:
+            is_equal = stu_normalized == sol_normalized
+        else:
+            is_equal = stu_normalized.contains(sol_normalized)
 
     def get_str(ast, code, sql):
         if sql:
@@ -319,15 +397,20 @@ def has_equal_ast(
         except:
             return None
 
-    sol_str = get_str(state.solution_ast, state.solution_code, sql)
-    _msg = incorrect_msg.format(
-        ast_path=state.get_ast_path()
-        or ("code" if state.highlighting_disabled else "highlighted code"),
-        extra="The checker expected to find `{}` in there.".format(sol_str)
-        if sol_str
-        else "Something is missing.",
-    )
-    if (exact and (sol_rep != stu_rep)) or (not exact and (sol_rep not in stu_rep)):
+    if not is_equal:
+        if state.correctness_only:
+            state.report(MSG_CHECK_FALLBACK)
+
+        sol_str = get_str(state.solution_ast, state.solution_code, sql)
+        _msg = incorrect_msg.format(
+            ast_path=state.get_ast_path()
+            or ("code" if state.highlighting_disabled else "highlighted code"),
+            extra="The checker expected to find `{}` in there.".format(sol_str)
+            if sol_str
+            else "Something is missing.",
+        )
+        if exact and not state.highlighting_disabled:
+            state = highlight_difference(state, sol_ast)
         if should_append_msg:
             state.report(_msg)
         state.report(_msg, append=False)
@@ -335,6 +418,47 @@ def has_equal_ast(
     return state
 
 
+class ParsedSnippet(NamedTuple):
+    ast: Any
+    repr: str
+
+
+def parse_snippet(ast_mod, sql, start) -> ParsedSnippet:
+    """Parse a code snippet used in an SCT, reusing earlier results
+
+    Failing parses are not cached.
+    """
+
+    def parse():
+        tree = ast_mod.parse(sql, start)
+        return ParsedSnippet(tree, repr(tree))
+
+    return SQL_SNIPPET_CACHE.get_or_set((ast_mod, start, sql), parse)
+
+
+def highlight_difference(state, sol_ast):
+    """Highlight the smallest part of the student code that differs from the solution
+
+    Returns:
+        a copy of the state with the differing student node as highlight,
+        or the state itself if the difference can't be localized.
+    """
+    difference = find_difference(state.student_ast, sol_ast)
+    if difference is None or not difference.path:
+        return state
+
+    try:
+        position = state.feedback_cls.get_highlight_position(difference.student)
+    except NotImplementedError:
+        position = None
+    if not position:
+        return state
+
+    highlight_state = copy(state)
+    highlight_state.highlight = difference.student
+    return highlight_state
+
+
 def has_parsed_ast(state):
     asts = [state.student_ast, state.solution_ast]
     if any(isinstance(c, state.ast_dispatcher.ParseError) for c in asts):
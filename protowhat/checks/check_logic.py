@@ -1,6 +1,9 @@
+import inspect
+
 from protowhat.failure import TestFail
 from functools import partial
 
+from protowhat.sct_syntax import is_async_check
 from protowhat.utils import legacy_signature
 
 
@@ -12,6 +15,7 @@ def multi(state, *tests):
     Args:
         state: State instance describing student and solution code,  can be omitted if used with Ex()
         tests: one or more sub-SCTs to run.
+            If one of them is async, the result has to be awaited (see ``AsyncLazyChain``).
 
     :Example:
         The SCT below checks two has_code cases.. ::
@@ -26,7 +30,11 @@ def multi(state, *tests):
                 check_edge('limit_clause')
             )
     """
-    for test in iter_tests(tests):
+    tests = list(iter_tests(tests))
+    if any(map(is_async_check, tests)):
+        return multi_async(state, tests)
+
+    for test in tests:
         # assume test is function needing a state argument
         # partial state so reporter can test
         state.do_test(partial(test, state))
@@ -35,6 +43,13 @@ def multi(state, *tests):
     return state
 
 
+async def multi_async(state, tests):
+    for test in tests:
+        await run_test(state, test)
+
+    return state
+
+
 @legacy_signature(incorrect_msg="msg")
 def check_not(state, *tests, msg):
     """Run multiple subtests that should fail. If all subtests fail, returns original state (for chaining)
@@ -61,7 +76,11 @@ def check_not(state, *tests, msg):
         If students use ``INNER (JOIN)`` or ``OUTER (JOIN)`` in their code, this test will fail.
 
     """
-    for test in iter_tests(tests):
+    tests = list(iter_tests(tests))
+    if any(map(is_async_check, tests)):
+        return check_not_async(state, tests, msg)
+
+    for test in tests:
         try:
             test(state)
         except TestFail:
@@ -73,6 +92,17 @@ def check_not(state, *tests, msg):
     return state
 
 
+async def check_not_async(state, tests, msg):
+    for test in tests:
+        try:
+            await run_test(state, test)
+        except TestFail:
+            continue
+        return state.report(msg)
+
+    return state
+
+
 def check_or(state, *tests):
     """Test whether at least one SCT passes.
 
@@ -95,10 +125,14 @@ def check_or(state, *tests):
                 check_edge('limit_clause')
             )
     """
+    tests = list(iter_tests(tests))
+    if any(map(is_async_check, tests)):
+        return check_or_async(state, tests)
+
     success = False
     first_failure = None
 
-    for test in iter_tests(tests):
+    for test in tests:
         try:
             multi(state, test)
             success = True
@@ -111,6 +145,20 @@ def check_or(state, *tests):
     raise first_failure
 
 
+async def check_or_async(state, tests):
+    first_failure = None
+
+    for test in tests:
+        try:
+            await run_test(state, test)
+            return state
+        except TestFail as e:
+            if first_failure is None:
+                first_failure = e
+
+    raise first_failure
+
+
 def check_correct(state, check, diagnose):
     """Allows feedback from a diagnostic SCT, only if a check SCT fails.
 
@@ -128,6 +176,9 @@ def check_correct(state, check, diagnose):
             )
 
     """
+    if any(map(is_async_check, iter_tests([check, diagnose]))):
+        return check_correct_async(state, check, diagnose)
+
     failure = None
     try:
         multi(state, check)
@@ -146,6 +197,33 @@ def check_correct(state, check, diagnose):
     return state  # todo: add test
 
 
+async def check_correct_async(state, check, diagnose):
+    failure = None
+    try:
+        await run_test(state, check)
+    except TestFail as e:
+        failure = e
+
+    if failure is not None or getattr(state, "force_diagnose", False):
+        try:
+            await run_test(state, diagnose)
+        except TestFail as e:
+            failure = e
+
+    if failure is not None:
+        raise failure
+
+    return state
+
+
+async def run_test(state, test):
+    """Run a (possibly async) sub-SCT, or multiple sub-SCTs"""
+    for test in iter_tests([test]):
+        result = test(state)
+        if inspect.isawaitable(result):
+            await result
+
+
 def iter_tests(tests):
     for arg in tests:
         if arg is None:
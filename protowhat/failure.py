@@ -1,4 +1,5 @@
 from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import TYPE_CHECKING, List, Generator, Callable
 
 from protowhat.Feedback import Feedback, FeedbackComponent
@@ -43,9 +44,48 @@ class InstructorError(Failure):
     pass
 
 
+# In production, SCTs are validated against the solution before grading submissions,
+# so debugging information for instructor errors isn't collected.
+# A context variable, so concurrent SCT runs (threads or tasks) don't affect each other.
+_production_mode: ContextVar[bool] = ContextVar("production_mode", default=False)
+
+
+@contextmanager
+def production_mode(enabled: bool = True):
+    """Skip collecting debugging information while running validated SCTs
+
+    :Example:
+
+        ::
+
+            with production_mode():
+                exec(sct, create_sct_context(sct_dict, state))
+    """
+    token = _production_mode.set(enabled)
+    try:
+        yield
+    finally:
+        _production_mode.reset(token)
+
+
+def set_production_mode(enabled: bool = True):
+    """Enable or disable production mode for the rest of the current context
+
+    Prefer ``production_mode``, which restores the previous mode afterwards.
+    """
+    _production_mode.set(enabled)
+
+
+def in_production_mode() -> bool:
+    return _production_mode.get()
+
+
 @contextmanager
 def debugger(state: "State", allow_failure: Callable[["State"], bool] = invert_failure):
-    # TODO: skip debugging in production
+    if in_production_mode():
+        yield False
+        return
+
     debugging = state.debug
     skippable = False  # not state.force_diagnose
     state.debug = True
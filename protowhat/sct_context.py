@@ -1,15 +1,18 @@
 import builtins
 
+from collections import ChainMap
 from functools import wraps
 from importlib import import_module
 from typing import Dict, Callable, Type, Any, Tuple
 
+from protowhat.ConnectionPool import ConnectionPool
 from protowhat.Reporter import Reporter
 from protowhat.State import State
 from protowhat.sct_syntax import (
     ExGen,
     LazyChainStart,
     EagerChain,
+    SharedChecks,
     state_dec_gen,
 )
 from protowhat.utils import get_class_parameters
@@ -25,23 +28,43 @@ def get_checks_dict(checks_module) -> Dict[str, Callable]:
     }
 
 
-def create_sct_context(sct_dict, root_state: State = None) -> Dict[str, Callable]:
+def decorate_checks(sct_dict: Dict[str, Callable]) -> Dict[str, Callable]:
+    """
+    Decorate the functions that will be available when running the SCT.
+
+    The result doesn't depend on the exercise, so it can be reused for every SCT run.
+
+    Args:
+        sct_dict: a dictionary of the functions to make available
+
+    Returns:
+        dict: the decorated functions and ``state_dec``
+    """
+    state_dec = state_dec_gen(sct_dict)
+    sct_ctx = {k: state_dec(v) for k, v in sct_dict.items()}
+
+    return {**sct_ctx, "state_dec": state_dec}  # state_dec is needed by ext packages
+
+
+def create_sct_context(
+    sct_dict, root_state: State = None, decorated_checks: Dict[str, Callable] = None
+) -> Dict[str, Callable]:
     """
     Create the globals that will be available when running the SCT.
 
     Args:
         sct_dict: a dictionary of the functions to make available
         root_state: a State instance with the exercise information available to the SCT
+        decorated_checks: the result of ``decorate_checks(sct_dict)``, to skip decorating again
 
     Returns:
         dict: the globals available to the SCT code
     """
-    state_dec = state_dec_gen(sct_dict)
-    sct_ctx = {k: state_dec(v) for k, v in sct_dict.items()}
+    if decorated_checks is None:
+        decorated_checks = decorate_checks(sct_dict)
 
     ctx = {
-        **sct_ctx,
-        "state_dec": state_dec,  # needed by ext packages
+        **decorated_checks,
         "Ex": ExGen(sct_dict, root_state),
         "F": LazyChainStart(sct_dict),
     }
@@ -49,10 +72,63 @@ def create_sct_context(sct_dict, root_state: State = None) -> Dict[str, Callable
     return ctx
 
 
+class SctContextTemplate:
+    """
+    Prebuilt SCT context for a technology.
+
+    Decorating the checks is done once, when the template is created.
+    Creating a context from the template only creates the chain constructors,
+    so it is cheap to do for every submission.
+
+    Every created context has its own registry of chainable functions,
+    layered on top of the checks of the template.
+    Functions registered on the chain constructors of a created context
+    are only available in that context.
+    Chains started by calling a check look them up when they run on the root state of the context.
+
+    :Example:
+
+        Build the template once per process::
+
+            template = SctContextTemplate.from_module(xwhat.checks)
+
+        And create the SCT globals for every submission::
+
+            sct_ctx = template.create(root_state)
+    """
+
+    def __init__(self, sct_dict: Dict[str, Callable]):
+        self.sct_dict = SharedChecks(sct_dict)
+        self.decorated_checks = decorate_checks(self.sct_dict)
+
+    @classmethod
+    def from_module(cls, checks_module) -> "SctContextTemplate":
+        return cls(get_checks_dict(checks_module))
+
+    def create(self, root_state: State = None) -> Dict[str, Callable]:
+        """
+        Create the globals that will be available when running the SCT.
+
+        Args:
+            root_state: a State instance with the exercise information available to the SCT
+
+        Returns:
+            dict: the globals available to the SCT code
+        """
+        chainable_functions = ChainMap({}, self.sct_dict)
+        if root_state is not None:
+            root_state.chainable_functions = chainable_functions
+
+        return create_sct_context(
+            chainable_functions, root_state, self.decorated_checks
+        )
+
+
 def create_embed_state(
     xstate: Type[State],
     parent_state: State,
     derive_custom_state_args: Callable[[State], Dict[str, Any]] = None,
+    connection_pools: Dict[str, ConnectionPool] = None,
 ) -> State:
     """
     Create the state for running checks in the embedded technology.
@@ -63,6 +139,8 @@ def create_embed_state(
         xstate: the State class of the embedded technology
         parent_state: state of the host technology to derive the embedded state from
         derive_custom_state_args: function to calculate instructor extra arguments to pass to the constructor of the embedded state
+        connection_pools: pools to check out connections from, by argument name (e.g. ``solution_conn``).
+            The connections are returned by calling ``release_connections`` on a state of the submission.
 
     Returns:
         an instance of xstate
@@ -90,16 +168,52 @@ def create_embed_state(
     # manually add / override arguments
     args.update(**custom_args)
 
+    for arg, pool in (connection_pools or {}).items():
+        args[arg] = parent_state.checkout_connection(pool)
+
     embed_state = xstate(**args)
     # TODO: other params? set manually through chain constructor or add State args
     # to pass: path, debug; don't pass: highlight, ast_dispatcher, params
     embed_state.creator = {"type": "embed", "args": {"state": parent_state}}
+    # record the checks of the embedded technology in the SCT run of the parent state
+    embed_state.check_log = parent_state.check_log
+    embed_state.solution_lookups = parent_state.solution_lookups
 
     return embed_state
 
 
+# State class and context template of a technology
+EmbedTechnology = Tuple[Type[State], SctContextTemplate]
+
+_embed_technologies: Dict[str, EmbedTechnology] = {}
+
+
+def get_embed_technology(technology: str) -> EmbedTechnology:
+    """
+    Get the State class and SCT context template of an embedded technology.
+
+    These are imported and built on first use and reused afterwards.
+
+    Args:
+        technology: the name of the embedded technology (the x in xwhat)
+    """
+    if technology not in _embed_technologies:
+        xwhat = import_module("{}what".format(technology))
+        xwhat_checks = import_module("{}what.checks".format(technology))
+
+        _embed_technologies[technology] = (
+            xwhat.State.State,
+            SctContextTemplate.from_module(xwhat_checks),
+        )
+
+    return _embed_technologies[technology]
+
+
 def create_embed_context(
-    technology: str, context: EagerChain, derive_custom_state_args=None
+    technology: str,
+    context: EagerChain,
+    derive_custom_state_args=None,
+    connection_pools: Dict[str, ConnectionPool] = None,
 ):
     """
     Create the globals that will be available when running the checks for the embedded technology.
@@ -109,23 +223,20 @@ def create_embed_context(
         context: the Chain of the host technology
             the checks for the embedded technology will use as starting point
         derive_custom_state_args: passed to create_embed_state
+        connection_pools: passed to create_embed_state
 
     Returns:
         dict: the variables available to the SCT code for the embedded technology
     """
     parent_state = context._state
 
-    xwhat = import_module("{}what".format(technology))
-    xwhat_checks = import_module("{}what.checks".format(technology))
-    xwhat_state = xwhat.State.State
-
-    xwhat_scts = get_checks_dict(xwhat_checks)
+    xwhat_state, xwhat_template = get_embed_technology(technology)
 
     embed_state = create_embed_state(
-        xwhat_state, parent_state, derive_custom_state_args
+        xwhat_state, parent_state, derive_custom_state_args, connection_pools
     )
 
-    return create_sct_context(xwhat_scts, root_state=embed_state)
+    return xwhat_template.create(root_state=embed_state)
 
 
 def get_embed_chain_constructors(*args, **kwargs) -> Tuple[Type, Type]:
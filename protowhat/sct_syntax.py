@@ -1,10 +1,11 @@
 import inspect
 from functools import wraps, reduce
 from itertools import chain as chain_iters
-from typing import Callable, Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Type
 
 from protowhat.State import State
-from protowhat.failure import Failure, InstructorError, _debug
+from protowhat.failure import Failure, InstructorError, _debug, in_production_mode
+from protowhat.utils import make_hashable
 
 
 def state_dec_gen(sct_dict: Dict[str, Callable]):
@@ -17,9 +18,9 @@ def state_dec_gen(sct_dict: Dict[str, Callable]):
             if isinstance(state, State):
                 return f(*args, **kwargs)
             else:
-                return LazyChain(
-                    ChainedCall(f, args, kwargs), chainable_functions=sct_dict
-                )
+                call = ChainedCall(f, args, kwargs)
+                chain_cls = AsyncLazyChain if is_async_call(call) else LazyChain
+                return chain_cls(call, chainable_functions=sct_dict)
 
         return wrapper
 
@@ -31,60 +32,177 @@ def get_check_name(check) -> str:
     return getattr(check, "__name__", getattr(check, "test_name", type(check).__name__))
 
 
+def is_async_check(check) -> bool:
+    """Check if running the check requires awaiting its result"""
+    return isinstance(check, AsyncLazyChain) or inspect.iscoroutinefunction(
+        inspect.unwrap(check)
+    )
+
+
+def is_async_call(call) -> bool:
+    """Check if running a (chained) call requires awaiting its result
+
+    Logic checks, like ``multi``, run the checks they get as arguments,
+    so a call is async if one of its arguments is an async check.
+    """
+    if isinstance(call, ChainedCall):
+        args = chain_iters(call.args, call.kwargs.values())
+        return is_async_check(call.callable) or any(map(has_async_check, args))
+    return is_async_check(call)
+
+
+def has_async_check(arg) -> bool:
+    if isinstance(arg, (list, tuple)):
+        return any(has_async_check(item) for item in arg)
+    return callable(arg) and is_async_check(arg)
+
+
+def check_sync_result(state):
+    if inspect.isawaitable(state):
+        if inspect.iscoroutine(state):
+            state.close()
+        raise TypeError(
+            "Async checks can't be run in a sync chain, "
+            "use a lazy chain (e.g. F()) and await running it."
+        )
+    return state
+
+
+def pure_check(check: Callable[..., State]) -> Callable[..., State]:
+    """Mark a check as pure: its result only depends on the state and the arguments.
+
+    Results of pure checks are reused within an SCT run if the run enables it,
+    by setting ``check_cache`` on its root state.
+    """
+    check.is_pure = True
+    return check
+
+
 def link_to_state(check: Callable[..., State]) -> Callable[..., State]:
     @wraps(check)
     def wrapper(state, *args, **kwargs):
-        new_state = None
-        error = None
-        should_debug = False
+        check_cache = None
+        if getattr(check, "is_pure", False):
+            check_cache = getattr(state, "check_cache", None)
+        if check_cache is None:
+            return run_linked(check, state, args, kwargs)
+
         try:
-            new_state = check(state, *args, **kwargs)
-        except Failure as exception:
-            error = exception
-            # TODO: add debug information to student failure in correct environment
-            # Prevent double debugging
-            # - by a manual debug call
-            # - by a logic function capturing an inner debug (keeping only the debug conclusion)
-            should_debug = (isinstance(error, InstructorError)) and get_check_name(
-                check
-            ) not in ["_debug", "multi", "check_correct", "check_or", "check_not"]
-
-            if should_debug:
-                # Try creating a child state to set creator info
-                # without overriding earlier creator info
-                try:
-                    new_state = state.to_child(error.feedback.conclusion)
-                except InstructorError:
-                    pass
-
-        if not new_state:
-            new_state = state
-
-        if new_state != state and hasattr(new_state, "creator"):
-            ba = inspect.signature(check).bind(state, *args, **kwargs)
-            ba.apply_defaults()
-            new_state.creator = {
-                "type": get_check_name(check),
-                "args": {**(new_state.creator or {}).get("args", {}), **ba.arguments},
-            }
-
-        if error:
-            if should_debug:
-                # The force flag prevents elevating a student failure with debugging info
-                # to InstructorError, which would break SCTs
-                _debug(
-                    new_state,
-                    "\n\nDebug on error:",
-                    force=isinstance(error, InstructorError),
-                )
+            # the state is part of the cached value, so its id isn't reused
+            key = (
+                id(state),
+                check,
+                make_hashable(args, identity=True),
+                make_hashable(kwargs, identity=True),
+            )
+        except TypeError:
+            return run_linked(check, state, args, kwargs)
+        cached = check_cache.get(key)
+        if cached is None or cached[0] is not state:
+            try:
+                result = run_linked(check, state, args, kwargs)
+            except Failure as exception:
+                cached = check_cache[key] = (state, None, exception)
+            else:
+                if inspect.isawaitable(result):
+                    # a coroutine can only be awaited once, cache its outcome instead
+                    return cache_awaitable(check_cache, key, state, result)
+                cached = check_cache[key] = (state, result, None)
 
+        _, result, error = cached
+        if error is not None:
             raise error
-
-        return new_state
+        return result
 
     return wrapper
 
 
+async def cache_awaitable(check_cache, key, state, awaitable) -> State:
+    try:
+        result = await awaitable
+    except Failure as exception:
+        check_cache[key] = (state, None, exception)
+        raise
+
+    check_cache[key] = (state, result, None)
+    return result
+
+
+def run_linked(check, state, args, kwargs) -> State:
+    try:
+        new_state = check(state, *args, **kwargs)
+    except Failure as exception:
+        return link_result(check, state, None, exception, args, kwargs)
+
+    if inspect.isawaitable(new_state):
+        # async check, the result is linked when it's available
+        return link_awaitable(check, state, new_state, args, kwargs)
+
+    return link_result(check, state, new_state, None, args, kwargs)
+
+
+async def link_awaitable(check, state, awaitable, args, kwargs) -> State:
+    try:
+        new_state = await awaitable
+    except Failure as exception:
+        return link_result(check, state, None, exception, args, kwargs)
+
+    return link_result(check, state, new_state, None, args, kwargs)
+
+
+def link_result(check, state, new_state, error, args, kwargs) -> State:
+    # set on the root state to record the outcome of all checks, see validate_sct
+    check_log = getattr(state, "check_log", None)
+    if check_log is not None:
+        check_log.append((get_check_name(check), error))
+
+    should_debug = False
+    if error:
+        # TODO: add debug information to student failure in correct environment
+        # Prevent double debugging
+        # - by a manual debug call
+        # - by a logic function capturing an inner debug (keeping only the debug conclusion)
+        should_debug = (
+            isinstance(error, InstructorError)
+            and not in_production_mode()
+            and get_check_name(check)
+            not in ["_debug", "multi", "check_correct", "check_or", "check_not"]
+        )
+
+        if should_debug:
+            # Try creating a child state to set creator info
+            # without overriding earlier creator info
+            try:
+                new_state = state.to_child(error.feedback.conclusion)
+            except InstructorError:
+                pass
+
+    if not new_state:
+        new_state = state
+
+    if new_state != state and hasattr(new_state, "creator"):
+        ba = inspect.signature(check).bind(state, *args, **kwargs)
+        ba.apply_defaults()
+        new_state.creator = {
+            "type": get_check_name(check),
+            "args": {**(new_state.creator or {}).get("args", {}), **ba.arguments},
+        }
+
+    if error:
+        if should_debug:
+            # The force flag prevents elevating a student failure with debugging info
+            # to InstructorError, which would break SCTs
+            _debug(
+                new_state,
+                "\n\nDebug on error:",
+                force=isinstance(error, InstructorError),
+            )
+
+        raise error
+
+    return new_state
+
+
 class ChainedCall:
     strict = False
     __slots__ = ("callable", "args", "kwargs")
@@ -112,9 +230,13 @@ class ChainedCall:
     def __call__(self, state: State) -> State:
         return self.callable(state, *self.args, **self.kwargs)
 
+    @property
+    def name(self) -> str:
+        return self.callable.__name__
+
     def __str__(self):
         return (
-            self.callable.__name__
+            self.name
             + "("
             + ", ".join(
                 chain_iters(
@@ -161,11 +283,14 @@ class Chain:
 
     def __getattr__(self, attr):
         chainable_functions = self.chainable_functions
-        if attr not in chainable_functions:
-            raise AttributeError("No function named %s" % attr)
-        else:
+        if attr in chainable_functions:
             # in case someone does: a = chain.a; a(...); a(...)
             return ChainExtender(self, chainable_functions[attr])
+        elif isinstance(chainable_functions, SharedChecks) and attr[:2] != "__":
+            # the function can be registered in the SCT context this chain is used in
+            return RegisteredChainExtender(self, attr)
+        else:
+            raise AttributeError("No function named %s" % attr)
 
     def __rshift__(self, f: Callable) -> "Chain":
         if isinstance(f, EagerChain):
@@ -178,12 +303,18 @@ class Chain:
         # wrapping the lazy chain makes it possible to reuse lazy chains
         # while still keeping a unique upstream chain (needed to lazily execute chains)
         # during execution, the state provides access to the full upstream context for an invocation
-        return type(self)(f, self)
+        return self.get_extension_cls(f)(f, self)
+
+    def get_extension_cls(self, call: Callable) -> Type["Chain"]:
+        """Get the type of the chain that results from extending this chain with a call"""
+        if type(self) is LazyChain and is_async_call(call):
+            return AsyncLazyChain
+        return type(self)
 
     def __call__(self, state) -> State:
         # running the chain (multiple runs possible)
         return reduce(
-            lambda s, call: call(s),
+            lambda s, call: check_sync_result(call(s)),
             (chain.call for chain in self._history if chain.call is not None),
             state,
         )
@@ -203,6 +334,30 @@ class LazyChain(Chain):
     pass
 
 
+class AsyncLazyChain(LazyChain):
+    """Lazy chain that includes async checks
+
+    Lazy chains become async chains when an async check is added.
+    Running the chain returns a coroutine, so checks waiting on I/O
+    don't block the event loop while waiting.
+
+    :Example:
+
+        If ``check_query`` is an ``async def`` check::
+
+            chain = F().check_query("SELECT 1").has_equal_value()
+            state = await chain(state)
+    """
+
+    async def __call__(self, state) -> State:
+        for chain in self._history:
+            if chain.call is not None:
+                state = chain.call(state)
+                if inspect.isawaitable(state):
+                    state = await state
+        return state
+
+
 class EagerChain(Chain):
     def __init__(
         self,
@@ -222,7 +377,12 @@ class EagerChain(Chain):
             state = previous._state
 
         if state and chained_call:
-            self._state = chained_call(state)
+            if is_async_call(chained_call):
+                raise TypeError(
+                    "Async checks can't be run eagerly, "
+                    "use a lazy chain (e.g. F()) and await running it."
+                )
+            self._state = check_sync_result(chained_call(state))
         else:
             self._state = state
 
@@ -254,9 +414,8 @@ class ChainExtender:
         self.function = function
 
     def __call__(self, *args, **kwargs) -> Chain:
-        return type(self.chain)(
-            ChainedCall(self.function, args, kwargs), previous=self.chain
-        )
+        call = ChainedCall(self.function, args, kwargs)
+        return self.chain.get_extension_cls(call)(call, previous=self.chain)
 
     def __getattr__(self, item):
         self.invalid_next_step(item)
@@ -264,6 +423,54 @@ class ChainExtender:
     def __rshift__(self, other):
         self.invalid_next_step(other)
 
+
+class RegisteredChainExtender(ChainExtender):
+    """Extend a chain with a function that is looked up when the chain runs"""
+
+    def __init__(self, chain: Chain, name: str):
+        super().__init__(chain, None)
+        self.name = name
+
+    def __call__(self, *args, **kwargs) -> Chain:
+        call = RegisteredCall(self.name, args, kwargs)
+        return self.chain.get_extension_cls(call)(call, previous=self.chain)
+
+    def invalid_next_step(self, next_step: str):
+        raise AttributeError(
+            "Expected a call of {} before {}. ".format(self.name, next_step)
+        )
+
+
+class SharedChecks(dict):
+    """Checks shared by the SCT contexts created from a template
+
+    Every context registers functions in its own registry, layered on top of these checks.
+    Chains started by calling a shared check don't know that registry yet,
+    so they look up other functions in the registry of the state they run on
+    (see ``State.chainable_functions``).
+    """
+
+
+class RegisteredCall(ChainedCall):
+    """Call of a function that is looked up by name when the call runs"""
+
+    __slots__ = ("name",)
+
+    def __init__(
+        self, name: str, args: Optional[tuple] = None, kwargs: Optional[dict] = None
+    ):
+        self.name = name
+        self.callable = None
+        self.args = args or ()
+        self.kwargs = kwargs or {}
+
+    def __call__(self, state: State) -> State:
+        chainable_functions = state.chainable_functions or {}
+        if self.name not in chainable_functions:
+            raise AttributeError("No function named %s" % self.name)
+        function = link_to_state(chainable_functions[self.name])
+        return function(state, *self.args, **self.kwargs)
+
     def invalid_next_step(self, next_step: str):
         raise AttributeError(
             "Expected a call of {} before {}. ".format(
@@ -0,0 +1,130 @@
+import hashlib
+from typing import Any, Callable, List, MutableMapping, NamedTuple, Optional
+
+from protowhat.failure import Failure, InstructorError
+from protowhat.State import State
+from protowhat.utils import LRUCache
+
+"""
+Validate SCTs by running them with the solution as submission, before grading submissions.
+"""
+
+
+class SctVerdict(NamedTuple):
+    key: str
+    valid: bool
+    # names of the checks that passed and failed, in the order they ran
+    passed_checks: List[str]
+    failed_checks: List[str]
+    # messages of the instructor errors raised by checks
+    instructor_errors: List[str]
+    # message of the failure if the solution doesn't pass the SCT
+    failure: Optional[str]
+    # solution-side results looked up in this run, see State.memoize_solution
+    solution_lookups: List[str]
+
+
+def get_validation_key(sct: str, solution_code, pre_exercise_code) -> str:
+    """Hash of everything the validity of an SCT depends on"""
+    sha = hashlib.sha256()
+    for part in (sct, solution_code, pre_exercise_code):
+        sha.update(repr(part).encode("utf-8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+def validate_sct(
+    run_sct: Callable[[State], Any],
+    state: State,
+    sct: str,
+    store: Optional[MutableMapping[str, SctVerdict]] = None,
+) -> SctVerdict:
+    """Run an SCT with the solution as submission and record the result
+
+    All diagnosing parts of the SCT are run, like when ``force_diagnose`` is set.
+    The verdict is stored by a hash of the SCT, solution and pre exercise code,
+    so grading workers can check if an SCT is valid without running it on the solution,
+    e.g. to grade submissions in production mode (see ``production_mode``).
+
+    Args:
+        run_sct: function that runs the SCT, starting from the root state
+        state: root state with the solution code as student code
+        sct: source code of the SCT
+        store: mapping to store the verdict in (and to look it up in first)
+
+    Returns:
+        the verdict
+
+    :Example:
+
+        At publish time::
+
+            def run_sct(state):
+                exec(sct, create_sct_context(sct_dict, state))
+
+            validate_sct(run_sct, solution_state, sct, store=verdicts)
+
+        When grading a submission::
+
+            mode = is_validated(verdicts, sct, solution_code, pre_exercise_code)
+            with production_mode(mode):
+                run_sct(submission_state)
+    """
+    key = get_validation_key(sct, state.solution_code, state.pre_exercise_code)
+    if store is not None and key in store:
+        return store[key]
+
+    state.force_diagnose = True
+    state.check_log = []
+    state.solution_lookups = []
+    if state.solution_cache is None:
+        state.solution_cache = LRUCache(maxsize=4096)
+
+    failure = None
+    sct_error = None
+    try:
+        run_sct(state)
+    except Failure as e:
+        failure = e
+    except IndexError as e:
+        # check_node and check_edge raise this if the solution doesn't have the part,
+        # so the SCT can't be run on any submission
+        failure = sct_error = e
+
+    instructor_errors = [
+        str(error) for _, error in state.check_log if isinstance(error, InstructorError)
+    ]
+    if sct_error is not None:
+        instructor_errors.append(str(sct_error))
+
+    verdict = SctVerdict(
+        key=key,
+        valid=failure is None,
+        passed_checks=[name for name, error in state.check_log if error is None],
+        failed_checks=[name for name, error in state.check_log if error is not None],
+        instructor_errors=instructor_errors,
+        failure=None if failure is None else str(failure),
+        solution_lookups=[
+            describe_solution_lookup(lookup)
+            for lookup in dict.fromkeys(state.solution_lookups)
+        ],
+    )
+
+    if store is not None:
+        store[key] = verdict
+
+    return verdict
+
+
+def is_validated(
+    store: MutableMapping[str, SctVerdict], sct: str, solution_code, pre_exercise_code
+) -> bool:
+    """Check if the SCT passed validation against this solution"""
+    verdict = store.get(get_validation_key(sct, solution_code, pre_exercise_code))
+    return verdict is not None and verdict.valid
+
+
+def describe_solution_lookup(key) -> str:
+    check_name, state_path, _ = key
+    path = " > ".join(check_type for check_type, _ in state_path)
+    return "{} at {}".format(check_name, path or "root")
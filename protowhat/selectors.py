@@ -1,20 +1,71 @@
-from typing import TypeVar, Generic, Union, List, Dict, Tuple
+from typing import TypeVar, Generic, Union, List, Dict, Tuple, Optional, Iterator
 from collections.abc import Mapping
-from ast import NodeVisitor
+from ast import AST, NodeVisitor, iter_fields
+from collections import deque
+from functools import lru_cache
 import inspect
 import importlib
 
 from protowhat.utils_messaging import get_ord
 
 
+class SelectionComplete(Exception):
+    """Raised to stop the traversal of a Selector when enough nodes are found"""
+
+    pass
+
+
 class Selector(NodeVisitor):
-    def __init__(self, target_cls, target_cls_name=None, strict=True, priority=None, include_head=False):
+    def __init__(
+        self,
+        target_cls,
+        target_cls_name=None,
+        strict=True,
+        priority=None,
+        include_head=False,
+        strategy="dfs",
+        max_depth=None,
+        limit=None,
+    ):
+        """
+        Args:
+            target_cls: class of the nodes to find
+            target_cls_name: name of the nodes to find, if ``target_cls`` isn't specific enough
+            strict: only match nodes of exactly ``target_cls`` (not subclasses)
+            priority: only descend into nodes with a lower priority
+            include_head: also consider the starting node
+            strategy: traverse the tree depth first (``"dfs"``) or breadth first (``"bfs"``).
+                The breadth first strategy doesn't use custom visit methods.
+            max_depth: don't look at nodes deeper than this number of steps from the starting node
+            limit: stop the traversal once this number of nodes is found
+        """
+        if strategy not in ("dfs", "bfs"):
+            raise ValueError("strategy should be 'dfs' or 'bfs', not %s" % strategy)
+
         self.target_cls = target_cls
         self.target_cls_name = target_cls_name
         self.strict = strict
         self.priority = priority if priority else self._get_node_priority(target_cls)
         self.out = []
         self.include_head = include_head
+        self.strategy = strategy
+        self.max_depth = max_depth
+        self.limit = limit
+        # node class -> (is match, descend into children, visit method)
+        # matching and priority only depend on the node class,
+        # so they are only calculated once per class
+        self._dispatch_table = {}
+        self._visiting = False
+        self._depth = 0
+
+    def find(self, node):
+        """Get all matching nodes, starting from node.
+
+        A selector can be reused to find nodes in multiple trees.
+        """
+        self.out = []
+        self.visit(node, head=True)
+        return self.out
 
     def visit(self, node, head=False):
         """
@@ -22,10 +73,67 @@ class Selector(NodeVisitor):
         and keep searching if their children have a lower priority.
         If self.include_head is True then the starting node will also be considered.
         """
-        if (not head or self.include_head) and self.is_match(node):
-            self.out.append(node)
-        if self.has_priority_over(node) or head:
-            return super().visit(node)
+        if self._visiting:
+            return self._visit_node(node)
+
+        self._visiting = True
+        self._depth = 0
+        try:
+            if self.strategy == "bfs":
+                self._visit_breadth_first(node, head)
+            else:
+                return self._visit_node(node, head)
+        except SelectionComplete:
+            pass
+        finally:
+            self._visiting = False
+
+    def _visit_node(self, node, head=False):
+        try:
+            is_match, descend, visitor = self._dispatch_table[node.__class__]
+        except KeyError:
+            is_match, descend, visitor = self._dispatch(node)
+
+        if (not head or self.include_head) and is_match:
+            self._add(node)
+        if (descend or head) and not self._at_max_depth(self._depth):
+            self._depth += 1
+            try:
+                return visitor(node)
+            finally:
+                self._depth -= 1
+
+    def _visit_breadth_first(self, node, head=False):
+        queue = deque([(node, 0, head)])
+        while queue:
+            node, depth, is_head = queue.popleft()
+            try:
+                is_match, descend, _ = self._dispatch_table[node.__class__]
+            except KeyError:
+                is_match, descend, _ = self._dispatch(node)
+
+            if (not is_head or self.include_head) and is_match:
+                self._add(node)
+            if (descend or is_head) and not self._at_max_depth(depth):
+                queue.extend((child, depth + 1, False) for child in iter_children(node))
+
+    def _at_max_depth(self, depth):
+        return self.max_depth is not None and depth >= self.max_depth
+
+    def _add(self, node):
+        self.out.append(node)
+        if self.limit is not None and len(self.out) >= self.limit:
+            raise SelectionComplete()
+
+    def _dispatch(self, node):
+        node_cls = node.__class__
+        dispatch = (
+            self.is_match(node),
+            self.has_priority_over(node),
+            getattr(self, "visit_" + node_cls.__name__, self.generic_visit),
+        )
+        self._dispatch_table[node_cls] = dispatch
+        return dispatch
 
     def visit_list(self, lst):
         # this allows the root to be a list
@@ -34,7 +142,9 @@ class Selector(NodeVisitor):
 
     def is_match(self, node):
         if self.strict:
-            if type(node) is self.target_cls:
+            # proxies (e.g. of shared nodes) match the node class they stand in for
+            node_cls = getattr(node, "_proxied_cls", None) or type(node)
+            if node_cls is self.target_cls:
                 return True
             else:
                 return False
@@ -54,15 +164,178 @@ class Selector(NodeVisitor):
         return getattr(node, "_priority", 0)
 
 
+def iter_children(node):
+    """Iterate over the child nodes, in the order NodeVisitor visits them"""
+    if isinstance(node, list):
+        # a list as root
+        yield from node
+        return
+
+    for _, value in iter_fields(node):
+        if isinstance(value, list):
+            yield from (item for item in value if isinstance(item, AST))
+        elif isinstance(value, AST):
+            yield value
+
+
+WILDCARD = "*"
+RECURSIVE_WILDCARD = "**"
+
+
+def parse_path_step(step: str):
+    if ":" in step:
+        return slice(*(int(part) if part else None for part in step.split(":")))
+    try:
+        return int(step)
+    except ValueError:
+        return step
+
+
+def iter_path_children(value):
+    if isinstance(value, (list, tuple)):
+        yield from value
+    elif isinstance(value, Mapping):
+        yield from value.values()
+    else:
+        for field in getattr(value, "_fields", ()):
+            child = getattr(value, field, None)
+            if child is not None:
+                yield child
+
+
+def iter_path_descendants(value):
+    yield value
+    for child in iter_path_children(value):
+        yield from iter_path_descendants(child)
+
+
+class PathSelector:
+    """Compiled path to select values from a tree
+
+    Use ``compile_path`` to get a (cached) instance.
+    """
+
+    def __init__(self, steps):
+        self.steps = tuple(steps)
+        self.is_simple = all(
+            isinstance(step, int)
+            or (isinstance(step, str) and step not in (WILDCARD, RECURSIVE_WILDCARD))
+            for step in self.steps
+        )
+
+    @classmethod
+    def from_spec(cls, spec) -> "PathSelector":
+        if isinstance(spec, str):
+            return cls(parse_path_step(step) for step in spec.split(".") if step)
+        else:
+            return cls(spec)
+
+    def select(self, node):
+        """Follow a path of only field names and indices"""
+        result = node
+        for step in self.steps:
+            if isinstance(step, str):
+                if isinstance(result, Mapping):
+                    result = result.get(step, None)
+                else:
+                    result = getattr(result, step, None)
+            elif isinstance(step, int):
+                result = result[step] if len(result) > step else None
+            if result is None:
+                break
+        return result
+
+    def iter(self, node) -> Iterator:
+        """Lazily iterate over all values at the end of the path"""
+        values = iter([node])
+        for step in self.steps:
+            values = self._apply_step(step, values)
+        return values
+
+    @staticmethod
+    def _apply_step(step, values):
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(step, slice):
+                if isinstance(value, (list, tuple)):
+                    yield from value[step]
+            elif isinstance(step, int):
+                if isinstance(value, (list, tuple)) and -len(value) <= step < len(value):
+                    yield value[step]
+            elif step == WILDCARD:
+                yield from iter_path_children(value)
+            elif step == RECURSIVE_WILDCARD:
+                yield from iter_path_descendants(value)
+            else:
+                if isinstance(value, Mapping):
+                    result = value.get(step, None)
+                else:
+                    result = getattr(value, step, None)
+                if result is not None:
+                    yield result
+
+    def __repr__(self):
+        return "<{} {}>".format(self.__class__.__name__, repr(self.steps))
+
+
+@lru_cache(maxsize=1024)
+def _compile_path(spec) -> PathSelector:
+    return PathSelector.from_spec(spec)
+
+
+def compile_path(spec) -> PathSelector:
+    """Get the PathSelector for a path spec, compiling it only once per spec"""
+    if isinstance(spec, PathSelector):
+        return spec
+    if isinstance(spec, list):
+        spec = tuple(spec)
+    try:
+        return _compile_path(spec)
+    except TypeError:  # unhashable steps, e.g. slices before Python 3.12
+        return PathSelector.from_spec(spec)
+
+
 T = TypeVar("T")
 
 
 class DispatcherInterface(Generic[T]):
     def find(self, name: str, node: T, *args, **kwargs) -> Union[List[T], Dict[str, T]]:
-        # todo: document signature, strategy kwarg (depth/breadth first)
+        """Find the nodes with the given name in the tree starting at node.
+
+        Implementations can support these keyword arguments:
+
+        - priority: only descend into nodes with a lower priority
+        - strategy: ``"dfs"`` (depth first, the default) or ``"bfs"`` (breadth first)
+        - max_depth: maximum number of steps from node to look for matching nodes
+        - limit: stop looking when this number of matching nodes is found
+        """
         raise NotImplementedError
 
-    def select(self, path: Union[str, Tuple], node: T) -> Union[T, List[T]]:
+    def find_nth(self, name: str, node: T, index=0, **kwargs) -> Tuple[Optional[T], int]:
+        """Find the node with the given name at position index in the tree starting at node.
+
+        Returns:
+            tuple: the node (None if there are not enough matching nodes)
+            and the number of matching nodes seen
+        """
+        nodes = self.find(name, node, **kwargs)
+        try:
+            return nodes[index], len(nodes)
+        except IndexError:
+            return None, len(nodes)
+
+    def select(self, path: Union[str, Tuple], node: T) -> Union[T, List[T], Iterator[T]]:
+        """Select a value by following a path of steps, starting at node.
+
+        A path is a string of steps separated by dots or a tuple of steps.
+        Steps can be field names, list indices, list slices (``"1:3"`` or ``slice(1, 3)``),
+        ``"*"`` (all children) and ``"**"`` (node and all its descendants).
+
+        Returns:
+            the selected value (None if it doesn't exist)
+            or, if the path contains slices or wildcards, an iterator over all selected values
+        """
         raise NotImplementedError
 
     @staticmethod
@@ -93,7 +366,11 @@ class Dispatcher(DispatcherInterface):
             self.ast_mod, "ParseError", type("ParseError", (Exception,), {})
         )
 
-    def find(self, name, node, *args, **kwargs):
+        # selectors are reused for finds with the same arguments
+        # they keep state while finding, so a selector is taken out while in use
+        self._idle_selectors = {}
+
+    def create_selector(self, name, *args, **kwargs) -> Selector:
         if self.nodes and name in self.nodes:
             ast_cls = self.nodes[name]
             strict_selector = True
@@ -101,32 +378,38 @@ class Dispatcher(DispatcherInterface):
             ast_cls = self.node_cls
             strict_selector = False
 
-        selector = Selector(
+        return Selector(
             ast_cls, target_cls_name=name, strict=strict_selector, *args, **kwargs
         )
-        selector.visit(node, head=True)
 
-        return selector.out
+    def find(self, name, node, *args, **kwargs):
+        try:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            idle_selectors = self._idle_selectors.setdefault(key, [])
+        except TypeError:  # unhashable arguments
+            return self.create_selector(name, *args, **kwargs).find(node)
+
+        try:
+            selector = idle_selectors.pop()
+        except IndexError:
+            selector = self.create_selector(name, *args, **kwargs)
+        try:
+            return selector.find(node)
+        finally:
+            idle_selectors.append(selector)
+
+    def find_nth(self, name, node, index=0, **kwargs):
+        if index >= 0:
+            # stop looking once the requested node is found
+            kwargs["limit"] = index + 1
+        return super().find_nth(name, node, index, **kwargs)
 
     def select(self, spec, node):
-        result = node
-        if isinstance(spec, tuple):
-            raise ValueError(
-                "This dispatcher currently doesn't support tuple specs for select"
-            )
-        if isinstance(spec, str):
-            spec = self._path_str_to_list(spec)
-        for step in spec:
-            if isinstance(step, str):
-                if isinstance(result, Mapping):
-                    result = result.get(step, None)
-                else:
-                    result = getattr(result, step, None)
-            elif isinstance(step, int):
-                result = result[step] if len(result) > step else None
-            if result is None:
-                break
-        return result
+        path = compile_path(spec)
+        if path.is_simple:
+            return path.select(node)
+        else:
+            return path.iter(node)
 
     def parse(self, code):
         try:
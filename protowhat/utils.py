@@ -1,7 +1,9 @@
 import itertools
+import threading
+from collections import OrderedDict
 from functools import wraps
 from inspect import signature, Parameter
-from typing import Type, Iterator, Callable, Dict
+from typing import Type, Iterator, Callable, Dict, Hashable, Any
 
 
 def get_class_parameters(cls: Type) -> Iterator[str]:
@@ -75,3 +77,101 @@ def legacy_signature(
         return wrapper
 
     return signature_decorator
+
+
+class LRUCache:
+    """A bounded mapping that discards the least recently used entries when full.
+
+    Safe to share between threads.
+
+    :Example:
+
+        cache = LRUCache(maxsize=2)
+        cache["a"] = 1
+        cache.get_or_set("b", lambda: 2) == 2
+        cache["c"] = 3
+        "a" not in cache
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get the value for key, computing and storing it first if it's missing.
+
+        If compute raises, nothing is stored.
+        """
+        try:
+            return self[key]
+        except KeyError:
+            value = compute()
+            self[key] = value
+            return value
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def make_hashable(value: Any, identity: bool = False) -> Hashable:
+    """Convert a value to a hashable value that identifies it, to use in cache keys.
+
+    Containers are converted recursively.
+
+    Args:
+        value: the value to convert
+        identity: whether objects without value-based equality are identified by themselves.
+            This is only correct for caches that are cleared before those objects are,
+            e.g. caches for a single SCT run.
+
+    Raises:
+        TypeError: if the value contains an unhashable object,
+            or an object without value-based equality and ``identity`` is ``False``.
+            Their string representation could match an unrelated object,
+            e.g. one created later at the same address.
+    """
+    if isinstance(value, dict):
+        items = ((k, make_hashable(v, identity)) for k, v in value.items())
+        return tuple(sorted(items, key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(make_hashable(item, identity) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(make_hashable(item, identity) for item in value)
+    if type(value).__hash__ is object.__hash__ and not identity:
+        raise TypeError(
+            "Can't identify a %s by its value" % type(value).__qualname__
+        )
+    hash(value)  # raises TypeError for unhashable values
+    return value
+
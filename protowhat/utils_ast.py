@@ -1,5 +1,7 @@
+import sys
 from ast import AST
 from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Union
 
 
 class DumpConfig:
@@ -72,6 +74,128 @@ class AstNode(AST):
         return "{}({})".format(self.__class__.__name__, args)
 
 
+class HashedTree:
+    """Tree with a structural hash for every subtree
+
+    Subtrees with equal hashes have equal representations (``repr`` of AstNodes).
+    """
+
+    __slots__ = ("value", "hash", "type", "fields", "items")
+
+    def __init__(self, value):
+        self.value = value
+        self.type = None
+        self.fields = None
+        self.items = None
+        if isinstance(value, (list, tuple)):
+            self.items = [HashedTree(item) for item in value]
+            self.hash = hash(("list", tuple(item.hash for item in self.items)))
+        elif hasattr(value, "_fields"):
+            self.type = value.__class__.__name__
+            self.fields = OrderedDict()
+            for field in value._fields:
+                child = getattr(value, field, None)
+                if child is not None:
+                    self.fields[field] = HashedTree(child)
+            self.hash = hash(
+                (self.type, tuple((k, v.hash) for k, v in self.fields.items()))
+            )
+        else:
+            self.hash = hash(("leaf", repr(value)))
+
+    @property
+    def is_node(self):
+        return self.fields is not None
+
+
+class TreeDifference(NamedTuple):
+    student: Any
+    solution: Any
+    # steps from the root to the differing nodes, usable as a Dispatcher.select path
+    path: List[Union[str, int]]
+
+
+def find_difference(student, solution) -> Optional[TreeDifference]:
+    """Find the smallest subtrees that contain all differences between two trees
+
+    Subtrees are compared using structural hashes, so identical subtrees are skipped
+    without comparing them. Starting from the roots, the search descends as long as
+    there is a single differing child. In lists, common leading and trailing items are skipped.
+
+    Returns:
+        the differing nodes, or None if the trees are equal
+    """
+    stu, sol = HashedTree(student), HashedTree(solution)
+    if stu.hash == sol.hash:
+        return None
+
+    path = []
+    difference = TreeDifference(student, solution, [])
+    while True:
+        if stu.is_node and sol.is_node:
+            difference = TreeDifference(stu.value, sol.value, list(path))
+
+        step = _get_single_differing_step(stu, sol)
+        if step is None:
+            return difference
+
+        if isinstance(step, str):
+            stu, sol = stu.fields[step], sol.fields[step]
+            path.append(step)
+        else:
+            stu_index, sol_index = step
+            stu, sol = stu.items[stu_index], sol.items[sol_index]
+            path.append(stu_index)
+
+
+def _get_single_differing_step(stu: HashedTree, sol: HashedTree):
+    if stu.is_node and sol.is_node:
+        if stu.type != sol.type or list(stu.fields) != list(sol.fields):
+            return None
+
+        differing_fields = [
+            field
+            for field in stu.fields
+            if stu.fields[field].hash != sol.fields[field].hash
+        ]
+        if len(differing_fields) == 1:
+            return differing_fields[0]
+
+    elif stu.items is not None and sol.items is not None:
+        stu_hashes = [item.hash for item in stu.items]
+        sol_hashes = [item.hash for item in sol.items]
+
+        start = 0
+        while (
+            start < min(len(stu_hashes), len(sol_hashes))
+            and stu_hashes[start] == sol_hashes[start]
+        ):
+            start += 1
+        stu_end, sol_end = len(stu_hashes), len(sol_hashes)
+        while (
+            stu_end > start
+            and sol_end > start
+            and stu_hashes[stu_end - 1] == sol_hashes[sol_end - 1]
+        ):
+            stu_end -= 1
+            sol_end -= 1
+
+        if stu_end - start == 1 and sol_end - start == 1:
+            return start, start
+
+    return None
+
+
+def reduce_slotted_node(node):
+    """Support copying nodes that store their fields in slots"""
+    slots = {
+        field: getattr(node, field)
+        for field in type(node).__slots__
+        if hasattr(node, field)
+    }
+    return type(node), (), (getattr(node, "__dict__", None) or None, slots)
+
+
 class ParseError(Exception):
     pass
 
@@ -94,10 +218,16 @@ class AstModule:
 
     # methods below are for updating an AstModule subclass based on data in the dump dictionary format --
 
+    # leaf strings up to this length are interned, so equal strings share memory
+    intern_max_length = 100
+
     @classmethod
     def load(cls, node):
         if not isinstance(node, dict):
-            return node  # return primitives
+            # return primitives
+            if type(node) is str and len(node) <= cls.intern_max_length:
+                return sys.intern(node)
+            return node
 
         type_str = node["type"]
         data = node["data"]
@@ -114,9 +244,29 @@ class AstModule:
     @classmethod
     def _instantiate_node(cls, type_str, fields):
         # TODO: implement on AstNode (+ interface to get classes)
+        return cls.get_node_cls(type_str, fields)()
+
+    @classmethod
+    def get_node_cls(cls, type_str, fields=()):
         node_cls = cls.nodes.get(type_str, None)
         if not node_cls:
-            node_cls = type(type_str, (cls.AstNode,), {"_fields": fields})
+            node_cls = cls._create_node_cls(type_str, fields)
             cls.nodes[type_str] = node_cls
 
-        return node_cls()
+        return node_cls
+
+    @classmethod
+    def _create_node_cls(cls, type_str, fields):
+        # store the fields in slots instead of an instance dict to save memory
+        # fields that are only present in some nodes of a type are stored in the dict
+        fields = tuple(sys.intern(field) for field in fields)
+        namespace = {
+            "_fields": fields,
+            "__slots__": fields,
+            "__reduce__": reduce_slotted_node,
+        }
+        try:
+            return type(type_str, (cls.AstNode,), namespace)
+        except (TypeError, ValueError):
+            # field names that can't be slots, e.g. conflicting with AstNode attributes
+            return type(type_str, (cls.AstNode,), {"_fields": fields})
@@ -0,0 +1,178 @@
+import os
+import stat as stat_module
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Set, Union
+
+PathLike = Union[str, os.PathLike]
+
+
+class FileInfo(NamedTuple):
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+def get_file_info(path: PathLike) -> Optional[FileInfo]:
+    try:
+        stat = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return FileInfo(stat_module.S_ISDIR(stat.st_mode), stat.st_size, stat.st_mtime)
+
+
+class WorkspaceSnapshot:
+    """Cached view of the files in a directory tree
+
+    The directory tree is walked once using ``os.scandir``, on first use.
+    After that, checking if a path exists or is a directory doesn't need any system calls.
+    The size and modification time of a file, and its content, are looked up lazily and cached.
+
+    Paths outside of the root directory are looked up on the file system directly.
+
+    The snapshot is not updated automatically when files change,
+    use ``invalidate`` to refresh (part of) it.
+
+    :Example:
+
+        Create a snapshot once and pass it to the file checks::
+
+            workspace = WorkspaceSnapshot("/home/repl", max_size=10 ** 6)
+            Ex().check_file("a.txt", workspace=workspace)
+            Ex().check_file("b.txt", workspace=workspace)
+    """
+
+    def __init__(
+        self, root: PathLike = ".", max_size: Optional[int] = None, encoding="utf-8"
+    ):
+        """
+        Args:
+            root: directory to take a snapshot of
+            max_size: files larger than this number of bytes are not read
+            encoding: encoding used to read the files
+        """
+        self.root = os.path.abspath(root)
+        self.max_size = max_size
+        self.encoding = encoding
+        # whether the paths in the tree are directories
+        self._entries: Optional[Dict[str, bool]] = None
+        self._infos: Dict[str, Optional[FileInfo]] = {}
+        self._contents: Dict[str, Optional[str]] = {}
+
+    @property
+    def entries(self) -> Dict[str, bool]:
+        if self._entries is None:
+            self._entries = {}
+            self._add_entry(self.root)
+        return self._entries
+
+    def _add_entry(self, path: str):
+        if os.path.isdir(path):
+            self._entries[path] = True
+            real_path = os.path.realpath(path)
+            self._scan(path, real_path, {real_path})
+        elif os.path.exists(path):
+            self._entries[path] = False
+
+    def _scan(self, directory: str, real_directory: str, real_parents: Set[str]):
+        # the type of an entry is known from scanning its directory on most platforms,
+        # only symlinks need an extra system call
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        continue
+                    self._entries[entry.path] = is_dir
+                    if not is_dir:
+                        continue
+
+                    if entry.is_symlink():
+                        # don't follow symlinks pointing to a parent directory forever
+                        real_path = os.path.realpath(entry.path)
+                        if real_path in real_parents:
+                            continue
+                    else:
+                        real_path = os.path.join(real_directory, entry.name)
+                    self._scan(entry.path, real_path, real_parents | {real_path})
+        except OSError:
+            pass
+
+    def contains(self, path: PathLike) -> bool:
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(
+            self.root.rstrip(os.sep) + os.sep
+        )
+
+    def get_info(self, path: PathLike) -> Optional[FileInfo]:
+        path = os.path.abspath(path)
+        if not self.contains(path):
+            return get_file_info(path)
+        if path not in self.entries:
+            return None
+        if path not in self._infos:
+            self._infos[path] = get_file_info(path)
+        return self._infos[path]
+
+    def exists(self, path: PathLike) -> bool:
+        if self.contains(path):
+            return os.path.abspath(path) in self.entries
+        return get_file_info(path) is not None
+
+    def is_dir(self, path: PathLike) -> bool:
+        if self.contains(path):
+            return self.entries.get(os.path.abspath(path), False)
+        info = get_file_info(path)
+        return info is not None and info.is_dir
+
+    def read_text(self, path: PathLike) -> Optional[str]:
+        """Get the content of a file
+
+        Returns:
+            the content, or None if the file is missing, unreadable or too large
+        """
+        path = os.path.abspath(path)
+        if path not in self._contents:
+            info = self.get_info(path)
+            content = None
+            if (
+                info is not None
+                and not info.is_dir
+                and (self.max_size is None or info.size <= self.max_size)
+            ):
+                try:
+                    content = Path(path).read_text(encoding=self.encoding)
+                except:
+                    pass
+            self._contents[path] = content
+
+        return self._contents[path]
+
+    def invalidate(self, path: Optional[PathLike] = None):
+        """Forget cached information
+
+        Args:
+            path: file or directory to refresh the information of.
+                If not specified, the complete snapshot is discarded.
+        """
+        if path is None:
+            self._entries = None
+            self._infos = {}
+            self._contents = {}
+            return
+
+        path = os.path.abspath(path)
+        prefix = path.rstrip(os.sep) + os.sep
+
+        def is_outdated(entry_path):
+            return entry_path == path or entry_path.startswith(prefix)
+
+        self._infos = {k: v for k, v in self._infos.items() if not is_outdated(k)}
+        self._contents = {
+            k: v for k, v in self._contents.items() if not is_outdated(k)
+        }
+        if self._entries is not None and self.contains(path):
+            self._entries = {
+                k: v for k, v in self._entries.items() if not is_outdated(k)
+            }
+            self._add_entry(path)
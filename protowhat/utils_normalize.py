@@ -0,0 +1,216 @@
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Iterable, Optional, Sequence, Union
+from weakref import WeakKeyDictionary
+
+"""
+Compare trees after normalizing parts that don't matter for correctness.
+
+Trees are converted to a canonical form of nested tuples:
+
+- node: ``(type name, ((field name, canonical value), ...))``
+- list: ``(LIST, (canonical item, ...))``
+- leaf: the value itself
+
+Normalization passes are applied to every node, after its children are normalized.
+A pass is called with the node type and an ordered dict of canonical field values,
+which it can update in place.
+"""
+
+LIST = "[]"
+
+NormalizationPass = Callable[[str, "OrderedDict[str, object]"], None]
+
+
+class NormalizedTree:
+    """Canonical form of a tree, with its hash computed once"""
+
+    __slots__ = ("canonical", "hash", "_subtrees")
+
+    def __init__(self, canonical):
+        self.canonical = canonical
+        self.hash = hash(canonical)
+        self._subtrees = None
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, NormalizedTree)
+            and self.hash == other.hash
+            and self.canonical == other.canonical
+        )
+
+    def __repr__(self):
+        return "NormalizedTree({!r})".format(self.canonical)
+
+    def contains(self, other: "NormalizedTree") -> bool:
+        """Check if the other tree is equal to this tree or one of its subtrees"""
+        if self._subtrees is None:
+            self._subtrees = set(iter_subtrees(self.canonical))
+        return other.canonical in self._subtrees
+
+
+def iter_subtrees(canonical):
+    yield canonical
+    if isinstance(canonical, tuple):
+        tag, children = canonical
+        if tag == LIST:
+            for child in children:
+                yield from iter_subtrees(child)
+        else:
+            for _, child in children:
+                yield from iter_subtrees(child)
+
+
+class Normalizer:
+    """Normalize trees using a pipeline of normalization passes
+
+    Every tree is normalized once, the result is cached for as long as the tree exists.
+
+    :Example:
+
+        Compare SQL expressions ignoring the order of operands of ``+`` and ``=``,
+        and the case of identifiers::
+
+            normalizer = Normalizer(
+                [
+                    sort_commutative(["BinaryExpr"], operators=["+", "="]),
+                    normalize_identifiers(["name"], node_types=["Identifier"]),
+                ]
+            )
+            Ex().check_node("SelectStmt").check_edge("where_clause").has_equal_ast(normalizer=normalizer)
+    """
+
+    def __init__(self, passes: Iterable[NormalizationPass] = ()):
+        self.passes = tuple(passes)
+        self._cache = WeakKeyDictionary()
+
+    def normalize(self, tree) -> NormalizedTree:
+        try:
+            return self._cache[tree]
+        except KeyError:
+            normalized = self._cache[tree] = NormalizedTree(self.canonicalize(tree))
+        except TypeError:
+            # trees that can't be weakly referenced, e.g. strings, aren't cached
+            normalized = NormalizedTree(self.canonicalize(tree))
+        return normalized
+
+    def canonicalize(self, value):
+        if isinstance(value, (list, tuple)):
+            return LIST, tuple(self.canonicalize(item) for item in value)
+        elif hasattr(value, "_fields"):
+            node_type = value.__class__.__name__
+            fields = OrderedDict()
+            for field in value._fields:
+                child = getattr(value, field, None)
+                if child is not None:
+                    fields[field] = self.canonicalize(child)
+            for normalization_pass in self.passes:
+                normalization_pass(node_type, fields)
+            return node_type, tuple(fields.items())
+        else:
+            return value
+
+
+# normalization passes --
+
+
+def sort_commutative(
+    node_types: Sequence[str],
+    operands: Union[str, Sequence[str]] = ("left", "right"),
+    operator: Optional[str] = "op",
+    operators: Optional[Iterable[str]] = None,
+) -> NormalizationPass:
+    """Sort the operands of commutative operations
+
+    Args:
+        node_types: names of the node types to normalize
+        operands: names of the operand fields, or the name of a field with a list of operands
+        operator: name of the field with the operator
+        operators: commutative operators (case insensitive).
+            If not specified, all operations of the node types are sorted.
+    """
+    operators = None if operators is None else {op.upper() for op in operators}
+
+    def normalize(node_type, fields):
+        if node_type not in node_types:
+            return
+        if operators is not None:
+            op = fields.get(operator)
+            if not isinstance(op, str) or op.upper() not in operators:
+                return
+
+        if isinstance(operands, str):
+            value = fields.get(operands)
+            if isinstance(value, tuple) and value[0] == LIST:
+                fields[operands] = LIST, tuple(sorted(value[1], key=repr))
+        elif all(field in fields for field in operands):
+            values = sorted((fields[field] for field in operands), key=repr)
+            fields.update(zip(operands, values))
+
+    return normalize
+
+
+def normalize_identifiers(
+    fields: Sequence[str],
+    node_types: Optional[Sequence[str]] = None,
+    case=True,
+    whitespace=True,
+) -> NormalizationPass:
+    """Normalize the case and whitespace of identifiers
+
+    Args:
+        fields: names of the fields that contain identifiers
+        node_types: names of the node types to normalize, all node types if not specified
+        case: whether to ignore the case of identifiers
+        whitespace: whether to ignore leading, trailing and repeated whitespace
+    """
+
+    def normalize_identifier(identifier):
+        if not isinstance(identifier, str):
+            return identifier
+        if whitespace:
+            identifier = " ".join(identifier.split())
+        if case:
+            identifier = identifier.casefold()
+        return identifier
+
+    return _normalize_leaves(normalize_identifier, fields, node_types)
+
+
+def normalize_literals(
+    fields: Sequence[str], node_types: Optional[Sequence[str]] = None
+) -> NormalizationPass:
+    """Normalize number literals, so e.g. ``1``, ``1.0`` and ``1e0`` are equal
+
+    Args:
+        fields: names of the fields that contain literals
+        node_types: names of the node types to normalize, all node types if not specified
+    """
+
+    def normalize_literal(literal):
+        if isinstance(literal, bool):
+            return literal
+        try:
+            number = Decimal(str(literal).strip())
+        except (InvalidOperation, TypeError, ValueError):
+            return literal
+        if not number.is_finite():
+            return literal
+        return str(number.normalize())
+
+    return _normalize_leaves(normalize_literal, fields, node_types)
+
+
+def _normalize_leaves(normalize_leaf, fields, node_types) -> NormalizationPass:
+    def normalize(node_type, node_fields):
+        if node_types is not None and node_type not in node_types:
+            return
+        for field in fields:
+            value = node_fields.get(field)
+            if value is not None and not isinstance(value, tuple):
+                node_fields[field] = normalize_leaf(value)
+
+    return normalize
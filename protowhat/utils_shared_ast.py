@@ -0,0 +1,384 @@
+import struct
+import threading
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Type
+
+from protowhat.utils_ast import AstModule
+
+"""
+Share read-only trees in the dump dictionary format between processes.
+
+The trees are stored once, as flat arrays in a shared memory block.
+Every process accesses them through lazy node proxies,
+so no process needs its own copy of the trees.
+"""
+
+MAGIC = b"PWAST002"
+
+# value kinds
+NONE, BOOL, INT, FLOAT, STR, NODE, LIST, BIG_INT = range(8)
+
+# range of the integers that fit in a payload, others are stored as strings
+INT_MIN, INT_MAX = -(2 ** 63), 2 ** 63 - 1
+
+# sections of the shared memory block, in order
+SECTIONS = (
+    ("string_offsets", "q"),
+    ("string_blob", "B"),
+    ("value_kinds", "b"),
+    ("value_payloads", "q"),
+    ("node_types", "q"),
+    ("node_field_starts", "q"),
+    ("node_field_counts", "q"),
+    ("field_names", "q"),
+    ("field_values", "q"),
+    ("lists", "q"),
+    ("root_names", "q"),
+    ("root_values", "q"),
+)
+HEADER = struct.Struct("8s" + "qq" * len(SECTIONS))
+
+
+def float_to_payload(value: float) -> int:
+    return struct.unpack("q", struct.pack("d", value))[0]
+
+
+def payload_to_float(payload: int) -> float:
+    return struct.unpack("d", struct.pack("q", payload))[0]
+
+
+class ArenaBuilder:
+    """Convert trees in the dump dictionary format to flat arrays"""
+
+    def __init__(self):
+        self.string_ids = {}
+        self.arrays = {name: array(typecode) for name, typecode in SECTIONS}
+
+    def add_string(self, string: str) -> int:
+        if string not in self.string_ids:
+            self.string_ids[string] = len(self.string_ids)
+        return self.string_ids[string]
+
+    def add_root(self, name: str, tree: dict):
+        self.arrays["root_names"].append(self.add_string(name))
+        self.arrays["root_values"].append(self.add_value(tree))
+
+    def add_value(self, value) -> int:
+        if value is None:
+            kind, payload = NONE, 0
+        elif isinstance(value, bool):
+            kind, payload = BOOL, int(value)
+        elif isinstance(value, int):
+            if INT_MIN <= value <= INT_MAX:
+                kind, payload = INT, value
+            else:
+                kind, payload = BIG_INT, self.add_string(str(value))
+        elif isinstance(value, float):
+            kind, payload = FLOAT, float_to_payload(value)
+        elif isinstance(value, str):
+            kind, payload = STR, self.add_string(value)
+        elif isinstance(value, dict):
+            kind, payload = NODE, self.add_node(value)
+        elif isinstance(value, (list, tuple)):
+            kind, payload = LIST, self.add_list(value)
+        else:
+            raise TypeError("Can't share values of type %s" % type(value).__name__)
+
+        value_id = len(self.arrays["value_kinds"])
+        self.arrays["value_kinds"].append(kind)
+        self.arrays["value_payloads"].append(payload)
+        return value_id
+
+    def add_node(self, node: dict) -> int:
+        # children first, so the fields of a node are contiguous
+        fields = [
+            (self.add_string(name), self.add_value(value))
+            for name, value in node["data"].items()
+        ]
+
+        node_id = len(self.arrays["node_types"])
+        self.arrays["node_types"].append(self.add_string(node["type"]))
+        self.arrays["node_field_starts"].append(len(self.arrays["field_names"]))
+        self.arrays["node_field_counts"].append(len(fields))
+        for name_id, value_id in fields:
+            self.arrays["field_names"].append(name_id)
+            self.arrays["field_values"].append(value_id)
+
+        return node_id
+
+    def add_list(self, values) -> int:
+        value_ids = [self.add_value(value) for value in values]
+        list_id = len(self.arrays["lists"])
+        self.arrays["lists"].append(len(value_ids))
+        self.arrays["lists"].extend(value_ids)
+        return list_id
+
+    def to_bytes(self) -> bytes:
+        encoded_strings = [string.encode("utf-8") for string in self.string_ids]
+        offsets = self.arrays["string_offsets"]
+        offsets.append(0)
+        for encoded_string in encoded_strings:
+            offsets.append(offsets[-1] + len(encoded_string))
+        self.arrays["string_blob"].frombytes(b"".join(encoded_strings))
+
+        sections = []
+        position = HEADER.size
+        for name, _ in SECTIONS:
+            section = self.arrays[name].tobytes()
+            padding = -position % 8
+            sections.append(b"\0" * padding + section)
+            position += padding
+            self.arrays[name] = (position, len(self.arrays[name]))
+            position += len(section)
+
+        header = HEADER.pack(
+            MAGIC, *(n for name, _ in SECTIONS for n in self.arrays[name])
+        )
+        return header + b"".join(sections)
+
+
+class AstNodeProxy:
+    """Read-only node that looks up its fields in a SharedAstArena on access
+
+    Proxy classes derive from this class and the node class of the AST module,
+    so they support the AstNode interface (e.g. ``_fields``).
+    Only the fields in the dump dictionary are stored, so attributes that aren't fields
+    are lost, e.g. the position information ``get_text`` and ``get_position`` need.
+    """
+
+    __slots__ = ()
+
+    # set on proxy classes: the node class this proxy stands in for
+    _proxied_cls = None
+
+    @property
+    def _fields(self):
+        return tuple(name for name, _ in self._arena.iter_node_fields(self._index))
+
+    def __getattr__(self, name):
+        if name.startswith("__") or name in ("_arena", "_index"):
+            raise AttributeError(name)
+        for field_name, value_id in self._arena.iter_node_fields(self._index):
+            if field_name == name:
+                return self._arena.get_value(value_id)
+        raise AttributeError(
+            "'{}' node has no field '{}'".format(type(self).__name__, name)
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Shared nodes are read-only")
+
+    def __reduce__(self):
+        return self._arena.get_node, (self._index,)
+
+
+_register_lock = threading.Lock()
+
+
+def attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach to a shared memory block without registering it for cleanup
+
+    Before Python 3.13, attaching registers the block with the resource tracker,
+    which unlinks it when this process ends, even though the creator owns it.
+    Unregistering afterwards isn't an option: child processes share the tracker
+    of their parent, so that would also drop the registration of the creator.
+    """
+    with _register_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+# arenas attached to in this process
+_attached_arenas = {}
+
+
+class SharedAstArena:
+    """Trees stored in shared memory, accessible from multiple processes
+
+    :Example:
+
+        In the parent process, store the solution trees once::
+
+            arena = SharedAstArena.create(
+                {exercise_id: AstModule.dump(tree) for exercise_id, tree in solutions.items()},
+                ast_module=AstModule,
+            )
+
+        The arena can be passed to forked or spawned workers
+        (or attached to using its name), where trees are used like normal trees::
+
+            solution_ast = arena[exercise_id]
+
+        Free the shared memory when all workers are done::
+
+            arena.close()
+            arena.unlink()
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        ast_module: Type[AstModule] = AstModule,
+        owner=False,
+    ):
+        self.shm = shm
+        self.ast_module = ast_module
+        self.owner = owner
+
+        magic, *offsets_and_counts = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC:
+            raise ValueError("The shared memory block doesn't contain shared trees")
+
+        self._views = {}
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, count = offsets_and_counts[2 * i : 2 * i + 2]
+            itemsize = array(typecode).itemsize
+            self._views[name] = shm.buf[offset : offset + count * itemsize].cast(
+                typecode
+            )
+        for name, view in self._views.items():
+            setattr(self, "_" + name, view)
+
+        self._strings = {}
+        self._proxy_classes = {}
+        self.roots = {
+            self.get_string(name_id): value_id
+            for name_id, value_id in zip(self._root_names, self._root_values)
+        }
+
+    @classmethod
+    def create(
+        cls, trees: Dict[str, dict], ast_module: Type[AstModule] = AstModule, name=None
+    ) -> "SharedAstArena":
+        """Store trees in a new shared memory block
+
+        Args:
+            trees: mapping of keys to trees in the dump dictionary format (see ``AstModule.dump``)
+            ast_module: AstModule subclass that provides the node classes
+            name: name of the shared memory block, a unique name is generated if not specified
+        """
+        builder = ArenaBuilder()
+        for key, tree in trees.items():
+            builder.add_root(key, tree)
+        data = builder.to_bytes()
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        shm.buf[: len(data)] = data
+
+        arena = _attached_arenas[(shm.name, ast_module)] = cls(
+            shm, ast_module, owner=True
+        )
+        return arena
+
+    @classmethod
+    def attach(cls, name: str, ast_module: Type[AstModule] = AstModule):
+        """Use the trees stored by ``create`` in another process
+
+        Attaching is done once per process, later calls return the same arena.
+        """
+        key = (name, ast_module)
+        if key in _attached_arenas:
+            return _attached_arenas[key]
+
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            shm = attach_untracked(name)
+
+        arena = _attached_arenas[key] = cls(shm, ast_module)
+        return arena
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __reduce__(self):
+        return type(self).attach, (self.name, self.ast_module)
+
+    def __getitem__(self, key: str):
+        return self.get_value(self.roots[key])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.roots
+
+    def get_string(self, string_id: int) -> str:
+        try:
+            return self._strings[string_id]
+        except KeyError:
+            start, end = self._string_offsets[string_id : string_id + 2]
+            string = self._strings[string_id] = str(
+                self._string_blob[start:end], "utf-8"
+            )
+            return string
+
+    def get_value(self, value_id: int) -> Any:
+        kind = self._value_kinds[value_id]
+        payload = self._value_payloads[value_id]
+        if kind == NODE:
+            return self.get_node(payload)
+        elif kind == STR:
+            return self.get_string(payload)
+        elif kind == INT:
+            return payload
+        elif kind == LIST:
+            length = self._lists[payload]
+            return [
+                self.get_value(value_id)
+                for value_id in self._lists[payload + 1 : payload + 1 + length]
+            ]
+        elif kind == BOOL:
+            return bool(payload)
+        elif kind == FLOAT:
+            return payload_to_float(payload)
+        elif kind == BIG_INT:
+            return int(self.get_string(payload))
+        return None
+
+    def get_node(self, node_id: int) -> AstNodeProxy:
+        type_str = self.get_string(self._node_types[node_id])
+        proxy_cls = self._proxy_classes.get(type_str)
+        if proxy_cls is None:
+            node_cls = self.ast_module.get_node_cls(
+                type_str, tuple(name for name, _ in self.iter_node_fields(node_id))
+            )
+            proxy_cls = self._proxy_classes[type_str] = type(
+                type_str,
+                (AstNodeProxy, node_cls),
+                {"__slots__": ("_arena", "_index"), "_proxied_cls": node_cls},
+            )
+
+        node = proxy_cls.__new__(proxy_cls)
+        object.__setattr__(node, "_arena", self)
+        object.__setattr__(node, "_index", node_id)
+        return node
+
+    def iter_node_fields(self, node_id: int):
+        start = self._node_field_starts[node_id]
+        end = start + self._node_field_counts[node_id]
+        for i in range(start, end):
+            yield self.get_string(self._field_names[i]), self._field_values[i]
+
+    def close(self):
+        """Stop using the shared memory in this process"""
+        _attached_arenas.pop((self.name, self.ast_module), None)
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory, should be called once by the creator"""
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if self.owner:
+            self.unlink()
@@ -1,8 +1,23 @@
+import ast
+
 from protowhat.Feedback import Feedback
 from protowhat.Reporter import Reporter
+from protowhat.selectors import Dispatcher
 from protowhat.State import State
 from protowhat.Test import Test
 
+# TODO: selectors require a _priority attribute
+#  this is a holdover from the sql ast modules
+ast.Expr._priority = 0
+DUMMY_NODES = {"Expr": ast.Expr}
+
+
+class ParseHey:
+    ParseError = SyntaxError
+
+    def parse(self, code, *args, **kwargs):
+        return ast.parse(code)
+
 
 class Success(Test):
     def test(self):
@@ -13,6 +28,21 @@ def state():
     return State("student_code", "", "", None, None, {}, {}, Reporter())
 
 
+def ast_state():
+    return State(
+        # only Reporter and Dispatcher are used
+        student_code="",
+        solution_code="",
+        reporter=Reporter(),
+        pre_exercise_code="",
+        student_result="",
+        solution_result="",
+        student_conn=None,
+        solution_conn=None,
+        ast_dispatcher=Dispatcher(ast.AST, DUMMY_NODES, ParseHey()),
+    )
+
+
 def noop(state):
     return state
 
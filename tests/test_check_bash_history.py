@@ -1,5 +1,6 @@
 import os
 import tempfile
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -14,7 +15,8 @@ from protowhat.checks.check_bash_history import (
     get_bash_history_info,
     get_bash_history,
     has_command,
-    prepare_validation)
+    prepare_validation,
+    run_command)
 
 
 @contextmanager
@@ -171,3 +173,51 @@ def test_prepare_validation(state):
         prepare_validation(state, ["ls", "echo abc"])
         has_command(state, "ls", "good job")
         has_command(state, "echo.*c", "well done")
+
+
+def test_prepare_validation_groups(state):
+    state.force_diagnose = True
+    with setup_workspace():
+        update_bash_history_info()
+        prepare_validation(state, [["ls", "echo abc"], "pwd"])
+        assert get_bash_history() == ["ls\n", "echo abc\n", "pwd\n"]
+
+
+def test_prepare_validation_concurrent(state):
+    state.force_diagnose = True
+    with setup_workspace():
+        update_bash_history_info()
+        prepare_validation(
+            state,
+            [
+                ["echo abc", "sleep 5", "echo skipped"],
+                ["echo abc", "false", "echo skipped"],
+                "echo def",
+            ],
+            concurrent=True,
+            max_workers=2,
+            timeout=0.5,
+        )
+        has_command(state, "echo.*c", "well done")
+
+        results = state.validation_results
+        assert [[result.args for result in group] for group in results] == [
+            ["echo abc", "sleep 5"],
+            ["echo abc", "false"],
+            ["echo def"],
+        ]
+        assert results[0][0].stdout == results[1][0].stdout == "abc\n"
+        assert results[0][1].returncode is None
+        assert results[1][1].returncode == 1
+        assert results[2][0].returncode == 0
+
+
+def test_run_command_timeout_kills_children():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        marker = Path(tmpdir, "marker")
+        # the subshell is a child of the shell running the command
+        result = run_command("(sleep 0.5; touch {}); true".format(marker), timeout=0.1)
+        assert result.returncode is None
+
+        time.sleep(0.8)
+        assert not marker.exists()
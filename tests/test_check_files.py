@@ -9,27 +9,19 @@ from tempfile import NamedTemporaryFile, TemporaryDirectory
 from unittest.mock import patch, mock_open
 
 from protowhat.failure import TestFail as TF
-from protowhat.selectors import Dispatcher
 from protowhat.State import State
 from protowhat.Reporter import Reporter
 
 from protowhat.sct_syntax import LazyChain, ExGen
 from protowhat.checks import check_files as cf
-from protowhat.checks.check_funcs import check_node, has_code
-
-# TODO: selectors require a _priority attribute
-#  this is a holdover from the sql ast modules
-ast.Expr._priority = 0
-DUMMY_NODES = {"Expr": ast.Expr}
+from protowhat.Feedback import Feedback
+from protowhat.checks.check_funcs import check_node, has_code, MSG_CHECK_FALLBACK
+from protowhat.utils_files import WorkspaceSnapshot
+from tests.helper import ast_state
 
 Ex = ExGen({}, None)
 
-
-class ParseHey:
-    ParseError = SyntaxError
-
-    def parse(self, code, *args, **kwargs):
-        return ast.parse(code)
+state = pytest.fixture(ast_state)
 
 
 def assert_equal_ast(a, b):
@@ -57,22 +49,6 @@ def temp_file(request):
     return request.getfixturevalue(request.param)
 
 
-@pytest.fixture
-def state():
-    return State(
-        # only Reporter and Dispatcher are used
-        student_code="",
-        solution_code="",
-        reporter=Reporter(),
-        pre_exercise_code="",
-        student_result="",
-        solution_result="",
-        student_conn=None,
-        solution_conn=None,
-        ast_dispatcher=Dispatcher(ast.AST, DUMMY_NODES, ParseHey()),
-    )
-
-
 def test_get_file_content_simple(temp_file_sum):
     content = cf.get_file_content(temp_file_sum.name)
     assert content == "1 + 1"
@@ -174,3 +150,100 @@ def test_load_file(state, temp_file):
 
     assert expected_content == cf.load_file(filename, prefix=common_path)
     assert expected_content == cf.load_file(filename, prefix=common_path + "/")
+
+
+def test_check_file_workspace(state, temp_file_sum):
+    workspace = WorkspaceSnapshot(Path(temp_file_sum.name).parent)
+    child = cf.check_file(state, temp_file_sum.name, workspace=workspace)
+    assert child.student_code == "1 + 1"
+
+    with pytest.raises(TF, match="Did you create the file"):
+        cf.check_file(state, temp_file_sum.name + "_missing", workspace=workspace)
+
+    cf.has_dir(state, Path(temp_file_sum.name).parent, workspace=workspace)
+    with pytest.raises(TF, match="found a directory"):
+        cf.check_file(state, Path(temp_file_sum.name).parent, workspace=workspace)
+
+    filename = os.path.basename(temp_file_sum.name)
+    common_path = os.path.dirname(temp_file_sum.name)
+    assert cf.load_file(filename, common_path, workspace=workspace) == "1 + 1"
+
+
+def test_check_file_max_size(state, temp_file_sum):
+    child = cf.check_file(state, temp_file_sum.name, max_size=5)
+    assert child.student_code == "1 + 1"
+
+    with pytest.raises(TF, match="too large"):
+        cf.check_file(state, temp_file_sum.name, max_size=4)
+
+    workspace = WorkspaceSnapshot(Path(temp_file_sum.name).parent, max_size=4)
+    for parse in [True, False]:
+        with pytest.raises(TF, match="too large"):
+            cf.check_file(state, temp_file_sum.name, parse=parse, workspace=workspace)
+
+
+def test_check_file_memory_map(state, temp_file_unicode):
+    child = cf.check_file(state, temp_file_unicode.name, memory_map=True)
+    assert child.student_ast is False
+    has_code(child, "Hervé", fixed=True)
+    has_code(child, "H.rv")
+    has_code(child, b"^Herv")
+
+    with pytest.raises(TF):
+        has_code(child, "Herve", fixed=True)
+
+
+def test_get_file_mmap_empty(state):
+    with NamedTemporaryFile() as tmp:
+        assert cf.get_file_mmap(tmp.name) == b""
+    assert cf.get_file_mmap("foo") is None
+
+
+def test_check_file_cache(state, temp_file_sum):
+    with patch.object(state, "parse", wraps=state.parse) as parse:
+        first = cf.check_file(state, temp_file_sum.name)
+        second = cf.check_file(state, temp_file_sum.name)
+        assert parse.call_count == 1
+        assert first.student_ast is second.student_ast
+
+        cf.check_file(first, temp_file_sum.name)
+        assert parse.call_count == 1
+
+        Path(temp_file_sum.name).write_text("2 + 2 + 2")
+        third = cf.check_file(state, temp_file_sum.name)
+        assert parse.call_count == 2
+        assert third.student_code == "2 + 2 + 2"
+
+
+def test_check_file_solution_cache(state, temp_file_sum):
+    solution_code = "4 + 4 + 4"
+    first = cf.check_file(state, temp_file_sum.name, solution_code=solution_code)
+    other_submission = State(
+        student_code="",
+        solution_code="",
+        reporter=Reporter(),
+        pre_exercise_code="",
+        student_result="",
+        solution_result="",
+        student_conn=None,
+        solution_conn=None,
+        ast_dispatcher=state.ast_dispatcher,
+    )
+    second = cf.check_file(
+        other_submission, temp_file_sum.name, solution_code=solution_code
+    )
+    assert first.solution_ast is second.solution_ast
+
+
+def test_correctness_only(state, temp_file_sum):
+    state.reporter = Reporter(correctness_only=True)
+    child = cf.check_file(state, temp_file_sum.name, solution_code="3 + 3")
+
+    with patch.object(
+        state.ast_dispatcher, "describe", side_effect=AssertionError
+    ), patch.object(Feedback, "get_message", side_effect=AssertionError):
+        node = check_node(child, "Expr", 0)
+        assert node.feedback_context is None
+        with pytest.raises(TF) as exception:
+            has_code(node, "3 + 3")
+        assert exception.value.feedback.conclusion.message == MSG_CHECK_FALLBACK
@@ -0,0 +1,124 @@
+import ast
+from unittest.mock import Mock
+
+import pytest
+
+from protowhat.failure import TestFail as TF
+from protowhat.checks.check_funcs import (
+    check_node,
+    check_edge,
+    has_equal_ast,
+    parse_snippet,
+)
+from protowhat.utils import LRUCache
+from protowhat.utils_ast import AstModule, AstNode
+from protowhat.utils_normalize import Normalizer, sort_commutative
+from tests.helper import ast_state
+
+state = pytest.fixture(ast_state)
+
+
+def test_check_node_missing_count(state):
+    class Speaker:
+        @staticmethod
+        def describe(node, field, fmt, **kwargs):
+            return fmt.format(node_name="expression", **kwargs)
+
+    state.ast_dispatcher.ast_mod.speaker = Speaker
+    child = state.to_child(
+        student_code="1", student_ast=ast.parse("1"), solution_ast=ast.parse("1\n2")
+    )
+
+    with pytest.raises(TF, match="Found 1 expression"):
+        check_node(child, "Expr", 1, missing_msg="Found {count} {node_name}.")
+
+
+def test_check_edge_path(state):
+    child = state.to_child(
+        student_ast=ast.parse("a\nb + 1"), solution_ast=ast.parse("a\nb + 1")
+    )
+    edge = check_edge(child, "body.*.value.left", 0)
+    assert edge.student_ast.id == "b"
+
+    with pytest.raises(TF):
+        check_edge(
+            state.to_child(student_ast=ast.parse("a"), solution_ast=child.solution_ast),
+            "body.*.value.left",
+            0,
+        )
+
+
+def test_has_equal_ast_highlight(state):
+    class PositionNode(AstNode):
+        def get_position(self):
+            return {"line_start": 1, "column_start": 1, "line_end": 1, "column_end": 1}
+
+    class Module(AstModule):
+        AstNode = PositionNode
+        nodes = {}
+
+    def load_call(*args):
+        return Module.load(
+            {
+                "type": "Call",
+                "data": {"args": [{"type": "Name", "data": {"id": a}} for a in args]},
+            }
+        )
+
+    student_ast = load_call("a", "b", "c")
+    child = state.to_child(
+        student_ast=student_ast, solution_ast=load_call("a", "x", "c")
+    )
+    with pytest.raises(TF) as exception:
+        has_equal_ast(child)
+    assert exception.value.feedback.highlight is student_ast.args[1]
+
+    child.highlighting_disabled = True
+    with pytest.raises(TF) as exception:
+        has_equal_ast(child)
+    assert exception.value.feedback.highlight is student_ast
+
+
+def test_has_equal_ast_normalizer(state):
+    class Module(AstModule):
+        nodes = {}
+
+    def load_binop(left, right):
+        return Module.load(
+            {"type": "BinOp", "data": {"left": left, "op": "+", "right": right}}
+        )
+
+    child = state.to_child(
+        student_ast=load_binop("a", "b"), solution_ast=load_binop("b", "a")
+    )
+    with pytest.raises(TF):
+        has_equal_ast(child)
+
+    normalizer = Normalizer([sort_commutative(["BinOp"])])
+    has_equal_ast(child, normalizer=normalizer)
+
+
+def test_parse_snippet_cache():
+    class Module(AstModule):
+        nodes = {}
+        parse = Mock(side_effect=lambda sql, start: sql.upper())
+
+    first = parse_snippet(Module, "a + 1", "expression")
+    assert first == ("A + 1", "'A + 1'")
+    assert parse_snippet(Module, "a + 1", "expression") is first
+    assert parse_snippet(Module, "a + 1", "sql_script") is not first
+    assert Module.parse.call_count == 2
+
+
+def test_solution_cache_direct_calls(state):
+    state.solution_cache = LRUCache()
+    child = state.to_child(
+        student_ast=ast.parse("a + 1\nb - 2"), solution_ast=ast.parse("a + 1\nb - 2")
+    )
+
+    # states created by calling checks directly can't be told apart by their path
+    first = check_edge(check_node(child, "Expr", 0), "value")
+    second = check_edge(check_node(child, "Expr", 1), "value")
+    assert isinstance(first.solution_ast.op, ast.Add)
+    assert isinstance(second.solution_ast.op, ast.Sub)
+    assert len(state.solution_cache) == 0
@@ -1,10 +1,18 @@
+import asyncio
+
 import pytest
 from functools import partial
 from protowhat.State import State
 from protowhat.checks import check_logic as cl
 from protowhat.Reporter import Reporter
 from protowhat.failure import TestFail as TF
-from protowhat.sct_syntax import link_to_state
+from protowhat.sct_syntax import (
+    AsyncLazyChain,
+    ExGen,
+    LazyChainStart,
+    link_to_state,
+    pure_check,
+)
 
 
 @pytest.fixture(scope="function")
@@ -89,3 +97,120 @@ def test_check_correct_fail_multi_msg(state):
     f1, f2, f3 = [partial(fails, msg="f%s" % ii) for ii in range(1, 4)]
     with pytest.raises(TF, match="f2"):
         cl.check_correct(state, [f1, f3], [f2, f3])
+
+
+async def async_passes(state):
+    await asyncio.sleep(0)
+    return state.to_child()
+
+
+async def async_fails(state, msg=""):
+    await asyncio.sleep(0)
+    cl.fail(state, msg)
+
+
+def test_multi_async(state):
+    assert asyncio.run(cl.multi(state, passes, [async_passes])) is state
+    with pytest.raises(TF):
+        asyncio.run(cl.multi(state, async_passes, async_fails))
+
+
+def test_check_or_async(state):
+    assert asyncio.run(cl.check_or(state, async_fails, passes)) is state
+    with pytest.raises(TF, match="f1"):
+        asyncio.run(
+            cl.check_or(
+                state, partial(async_fails, msg="f1"), partial(fails, msg="f2")
+            )
+        )
+
+
+def test_check_not_async(state):
+    assert asyncio.run(cl.check_not(state, async_fails, fails, msg="x")) is state
+    with pytest.raises(TF, match="x"):
+        asyncio.run(cl.check_not(state, async_fails, async_passes, msg="x"))
+
+
+def test_check_correct_async(state):
+    with pytest.raises(TF, match="diagnose"):
+        asyncio.run(
+            cl.check_correct(
+                state, async_fails, partial(async_fails, msg="diagnose")
+            )
+        )
+
+    state.force_diagnose = True
+    with pytest.raises(TF, match="diagnose"):
+        asyncio.run(
+            cl.check_correct(state, async_passes, partial(fails, msg="diagnose"))
+        )
+
+
+def test_logic_async_args(state):
+    sct_dict = {
+        "async_passes": async_passes,
+        "has_code": passes,
+        "multi": cl.multi,
+        "check_correct": cl.check_correct,
+    }
+    F = LazyChainStart(sct_dict)
+    Ex = ExGen(sct_dict, state)
+
+    with pytest.raises(TypeError):
+        Ex().multi(F().async_passes())
+    with pytest.raises(TypeError):
+        Ex().check_correct(F().async_passes(), F().has_code())
+
+    chain = F().multi(F().async_passes()).has_code()
+    assert isinstance(chain, AsyncLazyChain)
+    assert isinstance(F().multi([async_passes]), AsyncLazyChain)
+    assert not isinstance(F().multi(F().has_code()), AsyncLazyChain)
+    assert asyncio.run(chain(state)).parent_state is state
+
+
+def test_multi_shared_prefix(state):
+    calls = []
+
+    @pure_check
+    def child(state, name):
+        calls.append(name)
+        return state.to_child()
+
+    def impure_child(state):
+        calls.append("impure")
+        return state.to_child()
+
+    F = LazyChainStart({"child": child, "impure_child": impure_child})
+    tests = [
+        F().child("a").child("b"),
+        F().child("a").child("c"),
+        F().child("a").impure_child().child("b"),
+        F().child("a").impure_child().child("b"),
+    ]
+
+    # every test is run separately by default
+    cl.multi(state, *tests)
+    assert calls == ["a", "b", "a", "c", "a", "impure", "b", "a", "impure", "b"]
+
+    calls.clear()
+    state.check_cache = {}
+    cl.multi(state, *tests)
+    assert calls == ["a", "b", "c", "impure", "b", "impure", "b"]
+
+
+def test_check_correct_shared_prefix_failure(state):
+    calls = []
+
+    @pure_check
+    def child_fails(state):
+        calls.append("fail")
+        cl.fail(state, "shared")
+
+    F = LazyChainStart({"child_fails": child_fails, "fail": cl.fail})
+
+    state.check_cache = {}
+    with pytest.raises(TF, match="shared"):
+        cl.check_correct(
+            state, F().child_fails(), F().child_fails().fail("diagnose")
+        )
+    assert calls == ["fail"]
@@ -0,0 +1,109 @@
+import threading
+from itertools import count
+
+import pytest
+
+from protowhat.ConnectionPool import ConnectionPool, KeyedConnectionPool
+
+
+class Connection:
+    def __init__(self, id):
+        self.id = id
+        self.closed = False
+
+
+@pytest.fixture
+def pool():
+    ids = count()
+    return ConnectionPool(
+        lambda: Connection(next(ids)),
+        max_size=2,
+        check_health=lambda conn: not conn.closed,
+        close=lambda conn: setattr(conn, "closed", True),
+    )
+
+
+def test_connection_pool_reuse(pool):
+    with pool.connection() as conn:
+        assert conn.id == 0
+    with pool.connection() as conn:
+        assert conn.id == 0
+
+    first, second = pool.checkout(), pool.checkout()
+    assert (first.id, second.id) == (0, 1)
+    assert pool.size == 2
+
+
+def test_connection_pool_health_check(pool):
+    conn = pool.checkout()
+    pool.checkin(conn)
+    conn.closed = True
+
+    assert pool.checkout().id == 1
+    assert pool.size == 1
+
+    pool.discard(pool.checkout())
+    assert pool.size == 1
+
+
+def test_connection_pool_max_size(pool):
+    first, second = pool.checkout(), pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=0.01)
+
+    threading.Timer(0.01, pool.checkin, [first]).start()
+    assert pool.checkout(timeout=5) is first
+
+
+def test_connection_pool_close(pool):
+    idle, in_use = pool.checkout(), pool.checkout()
+    pool.checkin(idle)
+    pool.close()
+    assert idle.closed and not in_use.closed
+
+    pool.checkin(in_use)
+    assert in_use.closed
+    with pytest.raises(RuntimeError):
+        pool.checkout()
+
+
+def test_keyed_connection_pool():
+    with KeyedConnectionPool(lambda key: Connection(key), max_size=1) as pools:
+        a = pools.checkout("a")
+        assert a.id == "a"
+        assert pools.checkout("b").id == "b"
+        pools.checkin("a", a)
+        assert pools.get("a").checkout() is a
+
+
+def test_keyed_connection_pool_checkin_after_close():
+    pools = KeyedConnectionPool(
+        lambda key: Connection(key), close=lambda conn: setattr(conn, "closed", True)
+    )
+    conn = pools.checkout("a")
+    pools.close()
+
+    pools.checkin("a", conn)
+    assert conn.closed
+    assert pools.pools == {}
+
+
+def test_connection_pool_health_check_unlocked(pool):
+    # the pool isn't locked while checking health, so other threads can return connections
+    other = pool.checkout()
+    pool.checkin(pool.checkout())
+
+    def check_health(conn):
+        thread = threading.Thread(target=pool.checkin, args=[other])
+        thread.start()
+        thread.join(timeout=1)
+        return not thread.is_alive()
+
+    pool.check_health = check_health
+    assert pool.checkout(timeout=1).id == 1
+    pool.check_health = None
+    assert pool.checkout(timeout=1) is other
+
+
+def test_connection_pool_default_timeout():
+    assert ConnectionPool(lambda: None).timeout == 30
@@ -1,7 +1,15 @@
+import threading
+
 import pytest
 
-from protowhat.failure import _debug, InstructorError
-from protowhat.sct_syntax import LazyChain, ExGen
+from protowhat.failure import (
+    _debug,
+    InstructorError,
+    debugger,
+    in_production_mode,
+    production_mode,
+)
+from protowhat.sct_syntax import LazyChain, ExGen, link_to_state
 from tests.helper import state, dummy_checks, Success
 
 state = pytest.fixture(state)
@@ -39,3 +47,41 @@ def test_final_debug(state, dummy_checks):
     Ex = ExGen({"_debug": _debug, **dummy_checks}, state)
     Ex()._debug("breakpoint name", on_error=True).noop().child_state()
     assert state.reporter.fail
+
+
+@pytest.fixture
+def production():
+    with production_mode():
+        yield
+
+
+def test_production_mode_scope():
+    assert not in_production_mode()
+    with production_mode():
+        assert in_production_mode()
+
+        # other threads have their own context
+        results = []
+        thread = threading.Thread(target=lambda: results.append(in_production_mode()))
+        thread.start()
+        thread.join()
+        assert results == [False]
+
+        with production_mode(False):
+            assert not in_production_mode()
+        assert in_production_mode()
+    assert not in_production_mode()
+
+
+def test_debugger_production_mode(state, production):
+    with debugger(state):
+        assert not state.debug
+
+
+def test_link_to_state_production_mode(state, production):
+    def instructor_error(state):
+        raise InstructorError.from_message("instructor error")
+
+    with pytest.raises(InstructorError) as exception:
+        link_to_state(instructor_error)(state)
+    assert str(exception.value) == "instructor error"
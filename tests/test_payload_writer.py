@@ -0,0 +1,45 @@
+import gzip
+import io
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import pytest
+
+from protowhat.PayloadWriter import PayloadWriter
+from protowhat.Reporter import Reporter
+
+
+def test_payload_writer_buffer():
+    f = io.StringIO()
+    writer = PayloadWriter(f, buffer_size=100)
+
+    writer.write(Reporter().build_final_payload(), submission_id=1)
+    assert f.getvalue() == ""
+
+    writer.write({"correct": False, "message": "x" * 100}, submission_id=2)
+    lines = f.getvalue().splitlines()
+    assert [json.loads(line)["submission_id"] for line in lines] == [1, 2]
+    assert json.loads(lines[0])["correct"]
+
+    writer.write({"correct": True})
+    writer.close()
+    assert not f.closed
+    assert len(f.getvalue().splitlines()) == writer.count == 3
+
+
+def test_payload_writer_compression():
+    with TemporaryDirectory() as td:
+        path = Path(td, "results.jsonl.gz")
+        with PayloadWriter(path) as writer:
+            writer.write({"correct": True, "path": Path("a.py")})
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert json.loads(f.read()) == {"correct": True, "path": "a.py"}
+
+
+def test_payload_writer_invalid_compression():
+    with pytest.raises(ValueError):
+        PayloadWriter("results.jsonl", compression="zip")
+    with pytest.raises(ValueError):
+        PayloadWriter(io.StringIO(), compression="gzip")
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from collections import Counter
 from pathlib import Path
 
@@ -181,3 +183,25 @@ while True:
 </code></pre>"""
 
     assert payload["message"] == expected_message
+
+
+def test_lazy_rendering_imports():
+    code = (
+        "import sys; import protowhat.sct_context, protowhat.checks; "
+        "assert 'markdown2' not in sys.modules; assert 'jinja2' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_correctness_only():
+    r = Reporter(correctness_only=True)
+    f = Feedback(FeedbackComponent("msg"), highlight=Highlight(highlight_range_1))
+
+    assert r.build_failed_payload(f) == {"correct": False}
+    assert r.build_final_payload() == {"correct": True}
+
+    r.fail = True
+    assert r.build_final_payload() == {"correct": False}
+
+    assert Reporter(r).correctness_only
+    assert not Reporter(r, correctness_only=False).correctness_only
@@ -1,14 +1,18 @@
 import pytest
 
+from protowhat.ConnectionPool import ConnectionPool
 from protowhat.State import State
 from protowhat.sct_context import (
     get_checks_dict,
     create_sct_context,
+    decorate_checks,
+    SctContextTemplate,
     create_embed_state,
     create_embed_context,
     get_embed_chain_constructors,
 )
 from protowhat.sct_syntax import ChainStart, Chain, EagerChain, LazyChain, ExGen
+from tests import helper
 from tests.helper import state, dummy_checks
 
 
@@ -67,9 +71,78 @@ def test_create_sct_context(state, dummy_checks):
     assert isinstance(sct_ctx["F"](), LazyChain)
 
 
+def test_create_sct_context_decorated_checks(state, dummy_checks):
+    # Given
+    decorated_checks = decorate_checks(dummy_checks)
+
+    # When
+    sct_ctx = create_sct_context(dummy_checks, state, decorated_checks)
+
+    # Then
+    assert sct_ctx["noop"] is decorated_checks["noop"]
+    assert sct_ctx["state_dec"] is decorated_checks["state_dec"]
+    assert isinstance(sct_ctx["noop"](), LazyChain)
+    assert sct_ctx["Ex"].root_state is state
+
+
+def test_sct_context_template(state, dummy_checks):
+    # Given
+    template = SctContextTemplate(dummy_checks)
+    other_state = state.to_child()
+
+    # When
+    sct_ctx = template.create(state)
+    other_sct_ctx = template.create(other_state)
+
+    # Then
+    assert set(sct_ctx) == set(create_sct_context(dummy_checks, state))
+    assert sct_ctx["noop"] is other_sct_ctx["noop"]
+    assert sct_ctx["F"] is not other_sct_ctx["F"]
+    assert sct_ctx["Ex"]()._state is state
+    assert other_sct_ctx["Ex"]()._state is other_state
+    assert sct_ctx["Ex"].chain_roots is not other_sct_ctx["Ex"].chain_roots
+
+
+def test_sct_context_template_registry(state, dummy_checks):
+    # Given
+    template = SctContextTemplate(dummy_checks)
+    sct_ctx = template.create(state)
+    other_sct_ctx = template.create(helper.state())
+
+    # When
+    sct_ctx["Ex"].register_chainable_function(lambda state: state, "custom")
+
+    # Then
+    assert "custom" not in template.sct_dict
+    sct_ctx["Ex"]().custom()
+    sct_ctx["F"]().custom()
+    assert str(sct_ctx["Ex"]() >> sct_ctx["noop"]().custom()) == "noop().custom()"
+    with pytest.raises(AttributeError):
+        other_sct_ctx["Ex"]().custom()
+    with pytest.raises(AttributeError):
+        other_sct_ctx["F"]().custom()
+    with pytest.raises(AttributeError):
+        other_sct_ctx["Ex"]() >> other_sct_ctx["noop"]().custom()
+    with pytest.raises(AttributeError):
+        sct_ctx["noop"]().__custom__
+
+
+def test_sct_context_template_from_module():
+    # Given
+    from protowhat.checks import check_simple
+
+    # When
+    template = SctContextTemplate.from_module(check_simple)
+
+    # Then
+    assert template.sct_dict == get_checks_dict(check_simple)
+    assert "has_chosen" in template.create()
+
+
 def test_create_embed_state(state):
     # Given
     state.debug = True
+    state.check_log = []
     assert state.solution_result == {}
 
     class XState(State):
@@ -96,6 +169,7 @@ def test_create_embed_state(state):
     assert embed_state.reporter.runner == state.reporter
     assert embed_state.highlight_offset == {"test": "nonsense highlight"}
     assert embed_state.creator == {"type": "embed", "args": {"state": state}}
+    assert embed_state.check_log is state.check_log
 
 
 def test_create_embed_context(state, dummy_checks):
@@ -123,6 +197,22 @@ def test_create_embed_context(state, dummy_checks):
     assert embed_state.creator == {"type": "embed", "args": {"state": state}}
 
 
+def test_create_embed_context_cached(state, dummy_checks):
+    # Given
+    Ex = ExGen(dummy_checks, state)
+    other_state = state.to_child()
+
+    # When
+    embed_context = create_embed_context("proto", Ex())
+    other_embed_context = create_embed_context("proto", Ex(other_state))
+
+    # Then
+    assert embed_context["get_bash_history"] is other_embed_context["get_bash_history"]
+    assert embed_context["Ex"] is not other_embed_context["Ex"]
+    assert embed_context["Ex"].root_state.creator["args"]["state"] is state
+    assert other_embed_context["Ex"].root_state.creator["args"]["state"] is other_state
+
+
 def test_get_embed_chain_constructors(state, dummy_checks):
     # Given
     Ex = ExGen(dummy_checks, state)
@@ -134,3 +224,18 @@ def test_get_embed_chain_constructors(state, dummy_checks):
     # Then
     assert isinstance(EmbedEx(), EagerChain)
     assert isinstance(EmbedF(), LazyChain)
+
+
+def test_create_embed_state_connection_pools(state):
+    pool = ConnectionPool(object, max_size=1)
+
+    embed_state = create_embed_state(
+        State, state, connection_pools={"solution_conn": pool}
+    )
+    assert embed_state.solution_conn is not None
+    assert embed_state.student_conn is None
+    assert pool.size == 1
+
+    child = embed_state.to_child()
+    child.release_connections()
+    assert pool.checkout(timeout=0) is embed_state.solution_conn
@@ -1,15 +1,18 @@
+import asyncio
 import re
 
 import pytest
 
-from protowhat.failure import InstructorError
+from protowhat.failure import InstructorError, TestFail as TF
 from protowhat.sct_syntax import (
+    AsyncLazyChain,
     ChainedCall,
     ChainExtender,
     EagerChain,
     ExGen,
     LazyChain,
     LazyChainStart,
+    pure_check,
     state_dec_gen,
 )
 from tests.helper import state, dummy_checks
@@ -311,3 +314,92 @@ def test_sct_reflection_lazy(dummy_checks):
 
     assert str(Ex) == "noop().child_state().diagnose().fail()"
     assert str(chain) == str(Ex)
+
+
+def test_async_chain(state, dummy_checks):
+    async def async_child_state(state):
+        await asyncio.sleep(0)
+        return state.to_child()
+
+    sct_dict = {"async_child_state": async_child_state, **dummy_checks}
+    TestF = LazyChainStart(sct_dict)
+
+    chain = TestF().child_state().async_child_state().noop()
+    assert isinstance(chain, AsyncLazyChain)
+    assert not isinstance(TestF().child_state(), AsyncLazyChain)
+    assert isinstance(state_dec_gen(sct_dict)(async_child_state)(), AsyncLazyChain)
+
+    end_state = asyncio.run(chain(state))
+    assert len(end_state.state_history) == 3
+    assert end_state.creator["type"] == "async_child_state"
+
+    with pytest.raises(TypeError):
+        ExGen(sct_dict, state)().async_child_state()
+
+
+def test_async_chain_failure(state, dummy_checks):
+    async def async_fail(state):
+        await asyncio.sleep(0)
+        state.report("async fail")
+
+    TestF = LazyChainStart({"async_fail": async_fail, **dummy_checks})
+
+    with pytest.raises(TF, match="async fail"):
+        asyncio.run(TestF().child_state().async_fail()(state))
+
+
+def test_pure_check_memoization(state):
+    calls = []
+
+    @pure_check
+    def check_child(state, x):
+        calls.append(x)
+        return state.to_child()
+
+    @pure_check
+    def check_fail(state):
+        calls.append("fail")
+        state.report("fail")
+
+    TestF = LazyChainStart({"check_child": check_child, "check_fail": check_fail})
+
+    child = TestF().check_child(1)(state)
+    assert TestF().check_child(1)(state) is not child
+    assert len(calls) == 2
+
+    state.check_cache = {}
+    child = TestF().check_child(1)(state)
+    assert TestF().check_child(1)(state) is child
+    assert TestF().check_child(2)(state) is not child
+    assert calls[2:] == [1, 2]
+
+    for _ in range(2):
+        with pytest.raises(TF, match="fail"):
+            TestF().check_child(1).check_fail()(state)
+    assert calls[4:] == ["fail"]
+
+
+def test_pure_check_memoization_async(state):
+    calls = []
+
+    @pure_check
+    async def check_child(state):
+        await asyncio.sleep(0)
+        calls.append("child")
+        return state.to_child()
+
+    @pure_check
+    async def check_fail(state):
+        await asyncio.sleep(0)
+        calls.append("fail")
+        state.report("fail")
+
+    TestF = LazyChainStart({"check_child": check_child, "check_fail": check_fail})
+    state.check_cache = {}
+
+    child = asyncio.run(TestF().check_child()(state))
+    assert asyncio.run(TestF().check_child()(state)) is child
+    for _ in range(2):
+        with pytest.raises(TF, match="fail"):
+            asyncio.run(TestF().check_child().check_fail()(state))
+    assert calls == ["child", "fail"]
@@ -0,0 +1,83 @@
+import pytest
+
+from protowhat.failure import InstructorError
+from protowhat.sct_syntax import ExGen
+from protowhat.sct_validation import validate_sct, is_validated
+from protowhat.utils import LRUCache
+from tests.helper import state, dummy_checks
+
+state = pytest.fixture(state)
+dummy_checks = pytest.fixture(dummy_checks)
+
+
+def test_validate_sct(state, dummy_checks):
+    def lookup(state):
+        state.memoize_solution("lookup", lambda: "solution")
+        return state
+
+    def run_sct(state):
+        Ex = ExGen({"lookup": lookup, **dummy_checks}, state)
+        Ex().child_state().lookup()
+        assert state.force_diagnose
+
+    store = {}
+    verdict = validate_sct(run_sct, state, "sct", store=store)
+
+    assert verdict.valid
+    assert verdict.passed_checks == ["child_state", "lookup"]
+    assert verdict.failed_checks == []
+    assert verdict.solution_lookups == ["lookup at child_state"]
+    assert store[verdict.key] is verdict
+    assert validate_sct(None, state, "sct", store=store) is verdict
+
+    assert is_validated(store, "sct", state.solution_code, state.pre_exercise_code)
+    assert not is_validated(store, "sct", "other", state.pre_exercise_code)
+
+
+def test_validate_sct_failures(state, dummy_checks):
+    def instructor_error(state):
+        raise InstructorError.from_message("instructor error")
+
+    def run_sct(state):
+        Ex = ExGen({"instructor_error": instructor_error, **dummy_checks}, state)
+        Ex().noop().instructor_error()
+
+    verdict = validate_sct(run_sct, state, "sct")
+
+    assert not verdict.valid
+    assert verdict.passed_checks == ["noop"]
+    assert verdict.failed_checks == ["instructor_error"]
+    assert len(verdict.instructor_errors) == 1
+    assert "instructor error" in verdict.failure
+
+
+def test_validate_sct_missing_solution_part(state, dummy_checks):
+    def check_missing(state):
+        raise IndexError("Can't get SelectStmt statement at index 1")
+
+    def run_sct(state):
+        Ex = ExGen({"check_missing": check_missing, **dummy_checks}, state)
+        Ex().noop().check_missing()
+
+    verdict = validate_sct(run_sct, state, "sct")
+
+    assert not verdict.valid
+    assert verdict.passed_checks == ["noop"]
+    assert verdict.failure == "Can't get SelectStmt statement at index 1"
+    assert verdict.instructor_errors == [verdict.failure]
+
+
+def test_validate_sct_per_run(state, dummy_checks):
+    state.solution_cache = LRUCache()
+    state.solution_cache.get_or_set(("earlier", (), ()), lambda: "earlier run")
+    # created before the check log of the run is set up
+    child = state.to_child()
+
+    def run_sct(_):
+        Ex = ExGen(dummy_checks, child)
+        Ex().child_state()
+
+    verdict = validate_sct(run_sct, state, "sct")
+
+    assert verdict.passed_checks == ["child_state"]
+    assert verdict.solution_lookups == []
@@ -1,9 +1,16 @@
 import pytest
-
-from protowhat.selectors import Selector, get_ord, DispatcherInterface, Dispatcher
+from unittest.mock import patch
+
+from protowhat.selectors import (
+    Selector,
+    get_ord,
+    DispatcherInterface,
+    Dispatcher,
+    compile_path,
+)
 
 # use python's builtin ast library
-from ast import AST, Expr, Constant
+from ast import AST, Expr, Constant, BinOp, Add, Name, parse
 
 Constant._priority = 1
 
@@ -54,3 +61,104 @@ def test_dispatcher_select(node):
 @pytest.mark.parametrize("num, ord", [(1, "first"), (12, "12th"), (23, "23rd")])
 def test_ord(num, ord):
     assert get_ord(num) == ord
+
+
+def test_selector_find_reuse(node):
+    sel = Selector(Constant)
+    assert sel.find(node) == [node.value]
+
+    other_node = Expr(value=Constant(n=2))
+    assert sel.find(other_node) == [other_node.value]
+    assert Constant in sel._dispatch_table
+
+
+def test_dispatcher_find_reuses_selector(node):
+    dispatcher = Dispatcher(AST)
+    assert dispatcher.find("Constant", node) == [node.value]
+    assert dispatcher.find("Constant", Expr(value=Constant(n=2)))[0].value == 2
+    assert dispatcher.find("Constant", node, priority=99) == [node.value]
+
+    assert len(dispatcher._idle_selectors) == 2
+    assert all(len(selectors) == 1 for selectors in dispatcher._idle_selectors.values())
+
+
+@pytest.fixture
+def tree():
+    # Module > [Expr(BinOp(Constant(1), Constant(2))), Expr(Constant(3))]
+    return parse("1 + 2\n3")
+
+
+def test_selector_strategy(tree):
+    values = lambda nodes: [n.value for n in nodes]
+    assert values(Selector(Constant, priority=99).find(tree)) == [1, 2, 3]
+    assert values(Selector(Constant, priority=99, strategy="bfs").find(tree)) == [
+        3,
+        1,
+        2,
+    ]
+
+    with pytest.raises(ValueError):
+        Selector(Constant, strategy="random")
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+def test_selector_max_depth(tree, strategy):
+    sel = Selector(Constant, priority=99, strategy=strategy, max_depth=2)
+    assert [n.value for n in sel.find(tree)] == [3]
+    assert Selector(Expr, priority=99, strategy=strategy, max_depth=0).find(tree) == []
+
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs"])
+def test_selector_limit(tree, strategy):
+    sel = Selector(Constant, priority=99, strategy=strategy, limit=1)
+    assert len(sel.find(tree)) == 1
+    with patch.object(sel, "_dispatch", wraps=sel._dispatch) as dispatch:
+        sel.find(Expr(value=BinOp(Constant(1), Add(), Name("a"))))
+        dispatched = [call.args[0].__class__ for call in dispatch.call_args_list]
+        assert Name not in dispatched
+
+
+def test_dispatcher_find_limit(tree):
+    dispatcher = Dispatcher(AST)
+    assert len(dispatcher.find("Constant", tree, priority=99)) == 3
+    assert len(dispatcher.find("Constant", tree, priority=99, limit=2)) == 2
+
+
+def test_dispatcher_find_nth(tree):
+    dispatcher = Dispatcher(AST)
+    with patch.object(Selector, "_add", autospec=True, side_effect=Selector._add) as add:
+        node, count = dispatcher.find_nth("Constant", tree, 0, priority=99)
+        assert node.value == 1
+        assert count == 1
+        assert add.call_count == 1
+
+    assert dispatcher.find_nth("Constant", tree, -1, priority=99)[0].value == 3
+    assert dispatcher.find_nth("Constant", tree, 5, priority=99) == (None, 3)
+
+
+@pytest.mark.parametrize(
+    "spec, values",
+    [
+        (("body", 1, "value", "value"), 3),
+        ("body.0:1.value.left.value", [1]),
+        ("body.:.value.value", [3]),
+        (("body", slice(1, None), "value", "value"), [3]),
+        ("body.*.value.*.value", [1, 2]),
+        ("**.value", [1, 2, 3]),
+        ("body.1.**.value", [3]),
+        ("body.5.**", []),
+    ],
+)
+def test_dispatcher_select_paths(tree, spec, values):
+    result = Dispatcher(AST).select(spec, tree)
+    if isinstance(values, list):
+        assert [v for v in result if isinstance(v, int)] == values
+    else:
+        assert result == values
+
+
+def test_compile_path():
+    assert compile_path("a.1:.*") is compile_path("a.1:.*")
+    assert compile_path("a.1:.*").steps == ("a", slice(1, None), "*")
+    assert compile_path(["a", 0]).is_simple
+    assert not compile_path(("a", slice(0, 1))).is_simple
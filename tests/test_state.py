@@ -1,3 +1,5 @@
+from protowhat.sct_syntax import link_to_state
+from protowhat.utils import LRUCache
 from tests.helper import state
 
 
@@ -8,3 +10,32 @@ def test_is_root():
     second_state = state()
     second_state.creator = {"type": "check_something", "args": {"state": first_state}}
     assert not second_state.is_root
+
+
+def test_memoize_solution():
+    first_state, second_state = state(), state()
+    cache = LRUCache()
+    first_state.solution_cache = second_state.solution_cache = cache
+
+    def check_something(state, x):
+        return state.to_child()
+
+    first_child = link_to_state(check_something)(first_state, x=[1])
+    second_child = link_to_state(check_something)(second_state, x=[1])
+    assert first_child.get_state_path() == (("check_something", (("x", (1,)),)),)
+    assert first_child.solution_cache is cache
+
+    assert first_child.memoize_solution("check", lambda: "result", a=1) == "result"
+    assert second_child.memoize_solution("check", lambda: "other", a=1) == "result"
+    assert second_child.memoize_solution("check", lambda: "other", a=2) == "other"
+    assert first_state.memoize_solution("check", lambda: "root", a=1) == "root"
+
+    assert state().memoize_solution("check", lambda: "uncached") == "uncached"
+
+    # objects without value-based equality could match an object of another submission
+    workspace = object()
+    assert first_child.memoize_solution("check", lambda: 1, workspace=workspace) == 1
+    assert first_child.memoize_solution("check", lambda: 2, workspace=workspace) == 2
+    third_child = link_to_state(check_something)(first_state, x=workspace)
+    assert third_child.memoize_solution("check", lambda: 3, a=1) == 3
+    assert third_child.memoize_solution("check", lambda: 4, a=1) == 4
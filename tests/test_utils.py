@@ -5,6 +5,8 @@ from protowhat.utils import (
     legacy_signature,
     get_class_parameters,
     parameters_attr,
+    LRUCache,
+    make_hashable,
 )
 
 state = pytest.fixture(state)
@@ -60,3 +62,40 @@ def test_legacy_signature():
     assert func(arg1=1, old_arg2=2) == 3
     assert func(old_arg1=1, arg2=2) == 3
     assert func(old_arg1=1, old_arg2=2) == 3
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+
+    cache["c"] = 3
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+    assert cache.get_or_set("d", lambda: 4) == 4
+    assert cache.get_or_set("d", lambda: 5) == 4
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_make_hashable():
+    class Snapshot:
+        pass
+
+    key = make_hashable({"b": [1, {2}], "a": "x"})
+    assert hash(key) == hash(make_hashable({"a": "x", "b": [1, {2}]}))
+    assert key == (("a", "x"), ("b", (1, frozenset({2}))))
+
+    snapshot = Snapshot()
+    with pytest.raises(TypeError):
+        make_hashable({"workspace": snapshot})
+    assert make_hashable({"workspace": snapshot}, identity=True) == (
+        ("workspace", snapshot),
+    )
+    with pytest.raises(TypeError):
+        make_hashable([bytearray()], identity=True)
@@ -2,6 +2,7 @@ import bashlex
 import bashlex.errors
 from protowhat import utils_ast
 from collections import OrderedDict
+from copy import copy
 
 
 def dump_bash(obj, parent_cls=bashlex.ast.node, v=False):
@@ -52,3 +53,70 @@ def test_AstModule_load():
     tree = parser.parse(cmd)
 
     assert type(tree.list[0]) == parser.nodes["for"]
+
+
+def test_AstModule_load_slots():
+    class Module(utils_ast.AstModule):
+        nodes = {}
+
+    tree = Module.load(
+        {
+            "type": "Call",
+            "data": {
+                "func": {"type": "Name", "data": {"id": "f" * 10}},
+                "args": [{"type": "Name", "data": {"id": "f" * 10, "ctx": "x"}}],
+            },
+        }
+    )
+
+    assert Module.nodes["Call"]._fields == ("func", "args")
+    assert Module.nodes["Call"].__slots__ == ("func", "args")
+    assert not getattr(tree, "__dict__", None)
+    assert tree.func.id is tree.args[0].id
+    assert tree.args[0].ctx == "x"  # field not in the first node of this type
+
+    tree_copy = copy(tree)
+    assert tree_copy.func is tree.func
+    assert copy(tree.args[0]).ctx == "x"
+
+
+def test_AstModule_load_invalid_slots():
+    class Module(utils_ast.AstModule):
+        nodes = {}
+
+    node = Module.load({"type": "Weird", "data": {"_priority": 2, "a": 1}})
+    assert node._priority == 2
+    assert node.a == 1
+
+
+def test_find_difference():
+    class Module(utils_ast.AstModule):
+        nodes = {}
+
+    def binop(left, right):
+        return {"type": "BinOp", "data": {"left": left, "op": "+", "right": right}}
+
+    def name(id):
+        return {"type": "Name", "data": {"id": id}}
+
+    solution = Module.load(
+        {"type": "Call", "data": {"args": [name("a"), binop(name("b"), name("c"))]}}
+    )
+    student = Module.load(
+        {"type": "Call", "data": {"args": [name("a"), binop(name("b"), name("d"))]}}
+    )
+
+    assert utils_ast.find_difference(solution, copy(solution)) is None
+
+    difference = utils_ast.find_difference(student, solution)
+    assert difference.path == ["args", 1, "right"]
+    assert difference.student is student.args[1].right
+    assert difference.solution is solution.args[1].right
+
+    # multiple differences are localized to their common ancestor
+    student.args[1].left = Module.load(name("e"))
+    assert utils_ast.find_difference(student, solution).path == ["args", 1]
+
+    # extra list items are localized to the node containing the list
+    student.args.append(Module.load(name("f")))
+    assert utils_ast.find_difference(student, solution).path == []
@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pytest
+
+from protowhat.utils_files import WorkspaceSnapshot, get_file_info
+
+
+@pytest.fixture
+def workspace_dir():
+    with TemporaryDirectory() as td:
+        Path(td, "a.txt").write_text("a")
+        Path(td, "sub").mkdir()
+        Path(td, "sub", "b.txt").write_text("bbbb")
+        yield td
+
+
+def test_workspace_snapshot(workspace_dir):
+    workspace = WorkspaceSnapshot(workspace_dir)
+
+    assert workspace.exists(Path(workspace_dir, "a.txt"))
+    assert not workspace.is_dir(Path(workspace_dir, "a.txt"))
+    assert workspace.is_dir(Path(workspace_dir, "sub"))
+    assert workspace.exists(os.path.join(workspace_dir, "sub", "b.txt"))
+    assert not workspace.exists(Path(workspace_dir, "c.txt"))
+
+    assert workspace.read_text(Path(workspace_dir, "sub", "b.txt")) == "bbbb"
+    assert workspace.read_text(Path(workspace_dir, "sub")) is None
+
+
+def test_workspace_snapshot_outside_root(workspace_dir):
+    workspace = WorkspaceSnapshot(Path(workspace_dir, "sub"))
+
+    assert workspace.read_text(Path(workspace_dir, "a.txt")) == "a"
+    assert workspace.is_dir(workspace_dir)
+
+
+def test_workspace_snapshot_max_size(workspace_dir):
+    workspace = WorkspaceSnapshot(workspace_dir, max_size=2)
+
+    assert workspace.read_text(Path(workspace_dir, "a.txt")) == "a"
+    assert workspace.read_text(Path(workspace_dir, "sub", "b.txt")) is None
+
+
+def test_workspace_snapshot_invalidate(workspace_dir):
+    workspace = WorkspaceSnapshot(workspace_dir)
+    assert workspace.read_text(Path(workspace_dir, "a.txt")) == "a"
+
+    Path(workspace_dir, "a.txt").write_text("changed")
+    Path(workspace_dir, "sub", "c.txt").write_text("c")
+    assert workspace.read_text(Path(workspace_dir, "a.txt")) == "a"
+    assert not workspace.exists(Path(workspace_dir, "sub", "c.txt"))
+
+    workspace.invalidate(Path(workspace_dir, "a.txt"))
+    assert workspace.read_text(Path(workspace_dir, "a.txt")) == "changed"
+    assert not workspace.exists(Path(workspace_dir, "sub", "c.txt"))
+
+    workspace.invalidate(Path(workspace_dir, "sub"))
+    assert workspace.exists(Path(workspace_dir, "sub", "c.txt"))
+
+    Path(workspace_dir, "d.txt").write_text("d")
+    workspace.invalidate()
+    assert workspace.exists(Path(workspace_dir, "d.txt"))
+
+
+def test_workspace_snapshot_lazy_stat(workspace_dir):
+    workspace = WorkspaceSnapshot(workspace_dir)
+    with patch("protowhat.utils_files.get_file_info", wraps=get_file_info) as stat:
+        assert workspace.is_dir(Path(workspace_dir, "sub"))
+        assert workspace.exists(Path(workspace_dir, "sub", "b.txt"))
+        assert stat.call_count == 0
+
+        assert workspace.get_info(Path(workspace_dir, "sub", "b.txt")).size == 4
+        assert workspace.get_info(Path(workspace_dir, "sub", "b.txt")).size == 4
+        assert stat.call_count == 1
+
+
+def test_workspace_snapshot_symlink_loop(workspace_dir):
+    os.symlink(workspace_dir, os.path.join(workspace_dir, "sub", "up"))
+    workspace = WorkspaceSnapshot(workspace_dir)
+
+    assert workspace.is_dir(Path(workspace_dir, "sub", "up"))
+    assert not workspace.exists(Path(workspace_dir, "sub", "up", "sub"))
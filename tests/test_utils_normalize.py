@@ -0,0 +1,91 @@
+from protowhat.utils_ast import AstModule
+from protowhat.utils_normalize import (
+    Normalizer,
+    sort_commutative,
+    normalize_identifiers,
+    normalize_literals,
+)
+
+
+class Module(AstModule):
+    nodes = {}
+
+
+def binop(left, op, right):
+    return Module.load(
+        {"type": "BinaryExpr", "data": {"left": left, "op": op, "right": right}}
+    )
+
+
+def identifier(name):
+    return {"type": "Identifier", "data": {"name": name}}
+
+
+def literal(value):
+    return {"type": "Literal", "data": {"value": value}}
+
+
+def test_normalizer_no_passes():
+    normalizer = Normalizer()
+    a = binop(identifier("a"), "+", literal("1"))
+    b = binop(identifier("a"), "+", literal("1"))
+    c = binop(literal("1"), "+", identifier("a"))
+
+    assert normalizer.normalize(a) == normalizer.normalize(b)
+    assert normalizer.normalize(a) != normalizer.normalize(c)
+    assert normalizer.normalize(a) is normalizer.normalize(a)
+
+
+def test_sort_commutative():
+    normalizer = Normalizer([sort_commutative(["BinaryExpr"], operators=["+"])])
+
+    assert normalizer.normalize(
+        binop(identifier("a"), "+", literal("1"))
+    ) == normalizer.normalize(binop(literal("1"), "+", identifier("a")))
+    assert normalizer.normalize(
+        binop(identifier("a"), "-", literal("1"))
+    ) != normalizer.normalize(binop(literal("1"), "-", identifier("a")))
+
+
+def test_sort_commutative_list():
+    normalizer = Normalizer(
+        [sort_commutative(["And"], operands="args", operator=None)]
+    )
+
+    def and_(*names):
+        return Module.load(
+            {"type": "And", "data": {"args": [identifier(name) for name in names]}}
+        )
+
+    assert normalizer.normalize(and_("a", "b", "c")) == normalizer.normalize(
+        and_("c", "a", "b")
+    )
+
+
+def test_normalize_leaves():
+    normalizer = Normalizer(
+        [
+            normalize_identifiers(["name"], node_types=["Identifier"]),
+            normalize_literals(["value"]),
+        ]
+    )
+
+    assert normalizer.normalize(
+        binop(identifier(" My  Col"), "+", literal("1.0"))
+    ) == normalizer.normalize(binop(identifier("my col"), "+", literal(1)))
+    assert normalizer.normalize(
+        binop(identifier("a"), "+", literal("'1'"))
+    ) != normalizer.normalize(binop(identifier("a"), "+", literal("1")))
+
+
+def test_normalized_contains():
+    normalizer = Normalizer([sort_commutative(["BinaryExpr"])])
+    tree = normalizer.normalize(
+        binop(binop(identifier("a"), "=", literal("1")), "AND", identifier("b"))
+    )
+
+    assert tree.contains(
+        normalizer.normalize(binop(literal("1"), "=", identifier("a")))
+    )
+    assert tree.contains(normalizer.normalize(Module.load(identifier("b"))))
+    assert not tree.contains(normalizer.normalize(Module.load(identifier("c"))))
@@ -0,0 +1,74 @@
+import multiprocessing
+import pickle
+
+import pytest
+
+from protowhat.selectors import Dispatcher
+from protowhat.utils_ast import AstModule
+from protowhat.utils_shared_ast import SharedAstArena
+
+
+class SharedModule(AstModule):
+    nodes = {}
+
+
+# integers outside the int64 range are stored differently
+ECHO_ARGS = ["a", 1, 2.5, True, 2 ** 64, -(2 ** 63)]
+
+TREE = {
+    "type": "Script",
+    "data": {
+        "body": [
+            {"type": "Call", "data": {"name": "echo", "args": ECHO_ARGS}},
+            {"type": "Call", "data": {"name": "ls", "args": [], "flag": None}},
+        ],
+        "sep": ";",
+    },
+}
+
+
+@pytest.fixture
+def arena():
+    with SharedAstArena.create({"ex1": TREE}, ast_module=SharedModule) as arena:
+        yield arena
+
+
+def get_echo_args(arena):
+    return arena["ex1"].body[0].args
+
+
+def test_shared_ast(arena):
+    tree = arena["ex1"]
+    loaded_tree = SharedModule.load(TREE)
+
+    assert "ex1" in arena
+    assert tree._fields == ("body", "sep")
+    assert tree.sep == ";"
+    assert tree.body[0].args == ECHO_ARGS
+    assert tree.body[1].flag is None
+    assert repr(tree) == repr(loaded_tree)
+    assert isinstance(tree, SharedModule.AstNode)
+
+    with pytest.raises(AttributeError):
+        tree.missing
+    with pytest.raises(AttributeError):
+        tree.sep = "&&"
+
+
+def test_shared_ast_dispatcher(arena):
+    dispatcher = Dispatcher.from_module(SharedModule)
+    SharedModule.load(TREE)  # node classes also used by loaded trees
+
+    calls = dispatcher.find("Call", arena["ex1"])
+    assert [call.name for call in calls] == ["echo", "ls"]
+
+
+def test_shared_ast_pickle(arena):
+    node = pickle.loads(pickle.dumps(arena["ex1"].body[0]))
+    assert node.name == "echo"
+    assert node._arena is arena
+
+
+def test_shared_ast_spawned_worker(arena):
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        assert pool.apply(get_echo_args, (arena,)) == ECHO_ARGS